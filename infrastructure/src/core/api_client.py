@@ -4,137 +4,309 @@ OpenAI API client with rate limiting and structured outputs.
 import os
 import json
 import time
+import random
 import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any
-from tenacity import retry, wait_random_exponential, stop_after_attempt, retry_if_exception_type
-from openai import OpenAI, RateLimitError, APIError
+from typing import List, Dict, Any, Tuple, Callable
+import httpx
+from openai import OpenAI, DefaultHttpxClient, RateLimitError, APIError
 from pydantic import BaseModel
 
 from core.rate_limiter import AdaptiveRateLimiter, RequestMonitor
 
+try:
+    from blake3 import blake3
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401 -- enables httpx's HTTP/2 transport
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Errors worth retrying with backoff
+RETRYABLE_ERRORS = (RateLimitError, APIError)
+
+# Minimum keep-alive pool size: the adaptive rate limiter can raise concurrency up to 50
+HTTP_POOL_MIN = 50
+
+# Upper bound on decoded responses kept in memory in front of the disk cache
+MEM_CACHE_MAX = 1024
+
+# Cache filename prefix identifies the hash family so old SHA-256/MD5 entries never collide
+CACHE_KEY_PREFIX = 'b3_' if BLAKE3_AVAILABLE else 'b2_'
+
+def _read_json(path: Path) -> Any:
+    """Read a cache entry (orjson when available)."""
+    data = path.read_bytes()
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+def _write_json(path: Path, obj: Any):
+    """Write a cache entry as compact UTF-8 JSON (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        path.write_bytes(orjson.dumps(obj))
+    else:
+        path.write_bytes(json.dumps(obj, ensure_ascii=False).encode('utf-8'))
+
+def _new_hasher():
+    """Create a streaming hasher for cache keys (BLAKE3, falling back to BLAKE2b)."""
+    if BLAKE3_AVAILABLE:
+        return blake3()
+    return hashlib.blake2b(digest_size=16)
+
+def _heuristic_tokens(contents: List[str]) -> int:
+    """Rough token count used when no tokenizer is available."""
+    return sum(len(c) // 4 for c in contents)
+
+def _estimate_and_hash(messages: List[Dict[str, str]], max_tokens: int, *extra: str,
+                       count_tokens: Callable[[List[str]], int] = _heuristic_tokens) -> Tuple[int, str]:
+    """Estimate request tokens and hash the prompt in a single pass over messages.
+    
+    Role/content are fed to the hasher incrementally, so the prompt is never
+    concatenated into one string.
+    """
+    h = _new_hasher()
+    contents = []
+    for m in messages:
+        content = m['content']
+        contents.append(content)
+        h.update(m['role'].encode())
+        h.update(b'\0')
+        h.update(content.encode('utf-8'))
+        h.update(b'\0')
+    for value in extra:
+        h.update(value.encode('utf-8'))
+        h.update(b'\0')
+    digest = h.hexdigest(length=16) if BLAKE3_AVAILABLE else h.hexdigest()
+    return count_tokens(contents) + max_tokens, digest
+
 class APIClient:
     """OpenAI API client with rate limiting and caching."""
     
-    def __init__(self, cache_dir: Path, rate_limiter: AdaptiveRateLimiter, monitor: RequestMonitor):
+    def __init__(self, cache_dir: Path, rate_limiter: AdaptiveRateLimiter, monitor: RequestMonitor,
+                 http2: bool = False):
         self.cache_dir = cache_dir
         self.rate_limiter = rate_limiter
         self.monitor = monitor
         
+        # One keep-alive pool shared by every worker thread, sized so concurrent
+        # requests reuse open TCP/TLS connections instead of reconnecting
+        http_client = self._build_http_client(http2, max(rate_limiter.max_concurrent, HTTP_POOL_MIN))
+        
         # Initialize OpenAI client with Cloudflare gateway if configured
         account_id = os.getenv('CLOUDFLARE_ACCOUNT_ID')
         gateway_id = os.getenv('CLOUDFLARE_GATEWAY_ID')
         
         if account_id and gateway_id and account_id != '{account_id}' and gateway_id != '{gateway_id}':
             base_url = f"https://gateway.ai.cloudflare.com/v1/{account_id}/{gateway_id}/openai"
-            self.client = OpenAI(base_url=base_url)
+            self.client = OpenAI(base_url=base_url, http_client=http_client)
             logger.info("Using Cloudflare AI Gateway")
         else:
-            self.client = OpenAI()
+            self.client = OpenAI(http_client=http_client)
             logger.info("Using direct OpenAI API")
         
         self.model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        self._enc = self._load_encoding(self.model)
+        
+        # In-process LRU (L1) in front of the on-disk cache (L2)
+        self._mem_cache: OrderedDict = OrderedDict()
+        self._mem_lock = threading.Lock()
+    
+    @staticmethod
+    def _build_http_client(http2: bool, pool_size: int) -> httpx.Client:
+        """HTTP client with the SDK's defaults and a keep-alive pool of pool_size connections."""
+        if http2 and not H2_AVAILABLE:
+            logger.warning("HTTP/2 requested but the 'h2' package is not installed; using HTTP/1.1")
+            http2 = False
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        return DefaultHttpxClient(http2=http2, limits=limits)
+    
+    @staticmethod
+    def _load_encoding(model: str):
+        """Tokenizer for the model, or None to fall back to the len//4 heuristic."""
+        if not TIKTOKEN_AVAILABLE:
+            return None
+        try:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                return tiktoken.get_encoding('o200k_base')
+        except Exception as e:
+            logger.warning(f"Tokenizer unavailable, using heuristic token estimates: {e}")
+            return None
+    
+    def _count(self, contents: List[str]) -> int:
+        """Count prompt tokens with the cached tokenizer when available."""
+        if self._enc is None:
+            return _heuristic_tokens(contents)
+        encode = self._enc.encode_ordinary
+        return sum(len(encode(content)) for content in contents)
+    
+    def _mem_get(self, key: str):
+        """Return a decoded cached response from memory, or None."""
+        with self._mem_lock:
+            value = self._mem_cache.get(key)
+            if value is not None:
+                self._mem_cache.move_to_end(key)
+            return value
+    
+    def _mem_put(self, key: str, value):
+        """Store a decoded response in memory, evicting the oldest entry."""
+        with self._mem_lock:
+            self._mem_cache[key] = value
+            self._mem_cache.move_to_end(key)
+            if len(self._mem_cache) > MEM_CACHE_MAX:
+                self._mem_cache.popitem(last=False)
+    
+    @staticmethod
+    def _retry_delay(attempt: int, max_wait: float, error: Exception) -> float:
+        """Backoff before the next attempt, honoring Retry-After when the API sends one."""
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(max_wait, 0.1 * 2 ** attempt) * (1 + random.random() * 0.5)
+    
+    def _send_with_retries(self, send: Callable[[], Any], estimated_tokens: int,
+                           max_attempts: int, max_wait: float) -> Any:
+        """Run an API call with rate-limiter bookkeeping and exponential backoff.
+        
+        The caller already holds a rate-limiter slot for the first attempt. On a
+        retryable error the slot is returned before sleeping, so other workers can
+        use it during the backoff, and capacity is re-acquired for the next try.
+        """
+        for attempt in range(max_attempts):
+            if attempt:
+                self.rate_limiter.wait_for_capacity(estimated_tokens)
+            
+            start_time = time.time()
+            try:
+                result = send()
+            except Exception as e:
+                response_time = time.time() - start_time
+                self.rate_limiter.request_completed(False)
+                self.monitor.record_request(False, 0, response_time)
+                if not isinstance(e, RETRYABLE_ERRORS) or attempt == max_attempts - 1:
+                    raise
+                delay = self._retry_delay(attempt, max_wait, e)
+                logger.warning(f"{type(e).__name__}: retrying in {delay:.1f}s (attempt {attempt + 1}/{max_attempts})")
+                time.sleep(delay)
+                continue
+            
+            response_time = time.time() - start_time
+            self.rate_limiter.request_completed(True, estimated_tokens)
+            self.monitor.record_request(True, estimated_tokens, response_time)
+            return result
     
-    @retry(
-        wait=wait_random_exponential(min=0.1, max=10),
-        stop=stop_after_attempt(5),
-        retry=retry_if_exception_type((RateLimitError, APIError))
-    )
     def chat(self, messages: List[Dict[str, str]], max_tokens: int = 1024, 
              temperature: float = 0.3, cache: bool = True) -> str:
         """Make a chat completion request with rate limiting and caching."""
+        # Token estimate and cache key generation
+        estimated_tokens, digest = _estimate_and_hash(messages, max_tokens, count_tokens=self._count)
+        key = f'{CACHE_KEY_PREFIX}{digest}'
+        cache_file = self.cache_dir / f'{key}.json'
+        
+        if cache:
+            content = self._mem_get(key)
+            if content is not None:
+                return content
+        
         # Rate limiting
-        estimated_tokens = sum(len(m['content']) // 4 for m in messages) + max_tokens
         self.rate_limiter.wait_for_capacity(estimated_tokens)
         
-        # Cache key generation
-        key = hashlib.sha256(''.join(m['content'] for m in messages).encode()).hexdigest()
-        cache_file = self.cache_dir / f'{key}.json'
-        
         if cache and cache_file.exists():
             try:
+                content = _read_json(cache_file)['content']
                 self.rate_limiter.request_completed(True, 0)  # Cache hit
-                return json.loads(cache_file.read_text(encoding='utf-8'))['content']
+                self._mem_put(key, content)
+                return content
             except Exception:
                 pass
         
-        start_time = time.time()
-        try:
+        def send() -> str:
             resp = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 max_tokens=max_tokens,
                 temperature=temperature
             )
-            content = resp.choices[0].message.content.strip()
-            response_time = time.time() - start_time
-            
-            self.rate_limiter.request_completed(True, estimated_tokens)
-            self.monitor.record_request(True, estimated_tokens, response_time)
-            
-            if cache:
-                self.cache_dir.mkdir(parents=True, exist_ok=True)
-                cache_file.write_text(
-                    json.dumps({'content': content, 'ts': time.time()}), 
-                    encoding='utf-8'
-                )
-            return content
-            
-        except Exception as e:
-            response_time = time.time() - start_time
-            self.rate_limiter.request_completed(False)
-            self.monitor.record_request(False, 0, response_time)
-            raise e
+            return resp.choices[0].message.content.strip()
+        
+        content = self._send_with_retries(send, estimated_tokens, max_attempts=5, max_wait=10)
+        
+        if cache:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            _write_json(cache_file, {'content': content, 'ts': time.time()})
+            self._mem_put(key, content)
+        return content
 
-    @retry(
-        wait=wait_random_exponential(min=0.1, max=20),
-        stop=stop_after_attempt(7),
-        retry=retry_if_exception_type((RateLimitError, APIError))
-    )
     def structured_chat(self, messages: List[Dict[str, str]], response_format: BaseModel, 
                        max_tokens: int = 1000, cache: bool = True) -> BaseModel:
         """OpenAI API with structured output using Pydantic models."""
+        # Token estimate and cache key generation
+        estimated_tokens, content_hash = _estimate_and_hash(
+            messages, max_tokens, response_format.__name__, str(max_tokens), count_tokens=self._count
+        )
+        if cache:
+            key = f"structured_{CACHE_KEY_PREFIX}{content_hash}"
+            cache_file = self.cache_dir / f"{key}.json"
+            result = self._mem_get(key)
+            if result is not None:
+                return result
+        
         # Rate limiting
-        estimated_tokens = sum(len(m['content']) // 4 for m in messages) + max_tokens
         self.rate_limiter.wait_for_capacity(estimated_tokens)
         
-        if cache:
-            content_hash = hashlib.md5(json.dumps(messages, sort_keys=True).encode()).hexdigest()
-            cache_file = self.cache_dir / f"structured_{content_hash}.json"
-            if cache_file.exists():
-                try:
-                    cached_data = json.loads(cache_file.read_text(encoding='utf-8'))
-                    self.rate_limiter.request_completed(True, 0)  # Cache hit
-                    return response_format.model_validate(cached_data)
-                except Exception:
-                    pass
-        
-        start_time = time.time()
-        try:
+        if cache and cache_file.exists():
+            try:
+                cached_data = _read_json(cache_file)
+                result = response_format.model_validate(cached_data)
+                self.rate_limiter.request_completed(True, 0)  # Cache hit
+                self._mem_put(key, result)
+                return result
+            except Exception:
+                pass
+        
+        def send() -> BaseModel:
             response = self.client.beta.chat.completions.parse(
                 model=self.model,
                 messages=messages,
                 response_format=response_format,
                 max_tokens=max_tokens
             )
-            result = response.choices[0].message.parsed
-            response_time = time.time() - start_time
-            
-            self.rate_limiter.request_completed(True, estimated_tokens)
-            self.monitor.record_request(True, estimated_tokens, response_time)
-            
-            if cache:
-                cache_file.parent.mkdir(parents=True, exist_ok=True)
-                cache_file.write_text(result.model_dump_json(indent=2), encoding='utf-8')
-            
-            return result
-            
+            return response.choices[0].message.parsed
+        
+        try:
+            result = self._send_with_retries(send, estimated_tokens, max_attempts=7, max_wait=20)
         except Exception as e:
-            response_time = time.time() - start_time
-            self.rate_limiter.request_completed(False)
-            self.monitor.record_request(False, 0, response_time)
             logger.error(f"Structured API call failed: {e}")
-            raise e
\ No newline at end of file
+            raise e
+        
+        if cache:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            _write_json(cache_file, result.model_dump(mode='json'))
+            self._mem_put(key, result)
+        
+        return result
@@ -25,6 +25,9 @@ class MeetingSummary(BaseModel):
     named_entities: List[str]
     tags: List[str]
 
+class BatchMeetingSummary(BaseModel):
+    documents: List[MeetingSummary]
+
 class FrontMatter(BaseModel):
     date: str
     meeting: str
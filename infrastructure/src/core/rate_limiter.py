@@ -3,26 +3,56 @@ Rate limiting and concurrency management for OpenAI API calls.
 """
 import time
 import threading
+from collections import deque
 from dataclasses import dataclass
 from typing import Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fraction of the provider limits we allow ourselves to use
+SAFETY_FACTOR = 0.95
+
 @dataclass
 class RateLimitInfo:
     requests_per_minute: int = 5000  # Default for gpt-4o-mini
     tokens_per_minute: int = 200000  # Default for gpt-4o-mini
-    current_requests: int = 0
-    current_tokens: int = 0
-    window_start: float = 0
+    tokens_req: float = -1.0  # Available request tokens (-1 = start full)
+    tokens_tok: float = -1.0  # Available LLM-token tokens (-1 = start full)
+    last_refill: int = 0  # time.monotonic_ns() of the last refill
+    
+    def __post_init__(self):
+        if self.tokens_req < 0:
+            self.tokens_req = self.request_capacity
+        if self.tokens_tok < 0:
+            self.tokens_tok = self.token_capacity
+        self.last_refill = time.monotonic_ns()
+    
+    @property
+    def request_capacity(self) -> float:
+        return self.requests_per_minute * SAFETY_FACTOR
+    
+    @property
+    def token_capacity(self) -> float:
+        return self.tokens_per_minute * SAFETY_FACTOR
+    
+    def refill(self, now: int):
+        """Continuously refill both buckets at their per-minute rates (``now`` in monotonic ns)."""
+        # Integer nanoseconds: elapsed time never loses precision over a long run
+        dt = now - self.last_refill
+        if dt > 0:
+            minutes = dt / 60e9
+            self.tokens_req = min(self.request_capacity, self.tokens_req + minutes * self.requests_per_minute)
+            self.tokens_tok = min(self.token_capacity, self.tokens_tok + minutes * self.tokens_per_minute)
+            self.last_refill = now
 
 class AdaptiveRateLimiter:
     """Adaptive rate limiter that adjusts concurrency based on API responses."""
     
     def __init__(self):
         self.rate_info = RateLimitInfo()
-        self.lock = threading.Lock()
+        # Condition (wrapping a plain lock) so waiters wake as soon as capacity frees up
+        self.cv = threading.Condition()
         # Check environment variable for max parallel
         import os
         env_max = os.environ.get('OPENAI_MAX_PARALLEL', '20')
@@ -34,34 +64,57 @@ class AdaptiveRateLimiter:
         self.current_concurrent = 0
         self.error_count = 0
         self.success_count = 0
+        self._waiters = 0  # Threads blocked in wait_for_capacity (guarded by cv)
+    
+    def _can_proceed_locked(self, estimated_tokens: int) -> bool:
+        """Admission check; caller must hold ``self.cv``."""
+        info = self.rate_info
+        info.refill(time.monotonic_ns())
+        
+        # A single request larger than the bucket only needs a full bucket
+        needed_tokens = min(estimated_tokens, info.token_capacity)
+        
+        # Check if we can make the request
+        can_request = (
+            info.tokens_req >= 1 and
+            info.tokens_tok >= needed_tokens and
+            self.current_concurrent < self.max_concurrent
+        )
+        
+        if can_request:
+            info.tokens_req -= 1
+            info.tokens_tok -= needed_tokens
+            self.current_concurrent += 1
+        
+        return can_request
+    
+    def _time_until_refill_locked(self, estimated_tokens: int):
+        """Seconds until both buckets can cover the request; caller must hold ``self.cv``.
+        
+        Returns None when only the concurrency cap is in the way, since
+        request_completed will notify in that case.
+        """
+        info = self.rate_info
+        needed_tokens = min(estimated_tokens, info.token_capacity)
+        wait = max(
+            (1 - info.tokens_req) * 60 / info.requests_per_minute,
+            (needed_tokens - info.tokens_tok) * 60 / info.tokens_per_minute,
+        )
+        return max(0.001, wait) if wait > 0 else None
         
     def can_proceed(self, estimated_tokens: int = 1000) -> bool:
         """Check if we can make a request within rate limits."""
-        with self.lock:
-            now = time.time()
-            # Reset window every minute
-            if now - self.rate_info.window_start > 60:
-                self.rate_info.current_requests = 0
-                self.rate_info.current_tokens = 0
-                self.rate_info.window_start = now
-            
-            # Check if we can make the request
-            can_request = (
-                self.rate_info.current_requests < self.rate_info.requests_per_minute * 0.95 and
-                self.rate_info.current_tokens + estimated_tokens < self.rate_info.tokens_per_minute * 0.95 and
-                self.current_concurrent < self.max_concurrent
-            )
-            
-            if can_request:
-                self.rate_info.current_requests += 1
-                self.rate_info.current_tokens += estimated_tokens
-                self.current_concurrent += 1
-            
-            return can_request
+        with self.cv:
+            return self._can_proceed_locked(estimated_tokens)
     
     def request_completed(self, success: bool, actual_tokens: int = 0):
         """Record completion of a request and adjust concurrency."""
-        with self.lock:
+        # Keep the critical section to counter updates; log after releasing the lock
+        increased = reduced = None
+        with self.cv:
+            # Only a slot freed at the cap can unblock a waiter; waiters short on tokens
+            # already sleep until their refill time, so don't stampede them on every completion
+            was_at_cap = self.current_concurrent >= self.max_concurrent
             self.current_concurrent = max(0, self.current_concurrent - 1)
             
             if success:
@@ -69,25 +122,49 @@ class AdaptiveRateLimiter:
                 # Gradually increase concurrency on success
                 if self.success_count % 10 == 0 and self.max_concurrent < 50:
                     self.max_concurrent += 1
-                    logger.info(f"Increased max concurrent to {self.max_concurrent}")
+                    increased = self.max_concurrent
             else:
                 self.error_count += 1
                 # Aggressively reduce on error
                 self.max_concurrent = max(1, self.max_concurrent - 2)
-                logger.warning(f"Reduced max concurrent to {self.max_concurrent}")
+                reduced = self.max_concurrent
+            
+            if self._waiters and was_at_cap:
+                self.cv.notify_all()
+        
+        if increased is not None:
+            logger.info(f"Increased max concurrent to {increased}")
+        if reduced is not None:
+            logger.warning(f"Reduced max concurrent to {reduced}")
     
     def wait_for_capacity(self, estimated_tokens: int = 1000):
         """Wait until we have capacity for the request."""
-        while not self.can_proceed(estimated_tokens):
-            time.sleep(0.1)  # Very short wait for aggressive processing
+        with self.cv:
+            # Fast path: admitted without ever touching the wait machinery
+            if self._can_proceed_locked(estimated_tokens):
+                return
+            self._waiters += 1
+            try:
+                while True:
+                    # Woken early by request_completed/configure; otherwise once tokens refill
+                    self.cv.wait(timeout=self._time_until_refill_locked(estimated_tokens))
+                    if self._can_proceed_locked(estimated_tokens):
+                        return
+            finally:
+                self._waiters -= 1
     
     def configure(self, requests_per_minute: int, tokens_per_minute: int, max_concurrent: int = None):
         """Configure rate limits."""
-        with self.lock:
-            self.rate_info.requests_per_minute = requests_per_minute
-            self.rate_info.tokens_per_minute = tokens_per_minute
+        with self.cv:
+            info = self.rate_info
+            info.refill(time.monotonic_ns())
+            info.requests_per_minute = requests_per_minute
+            info.tokens_per_minute = tokens_per_minute
+            info.tokens_req = min(info.tokens_req, info.request_capacity)
+            info.tokens_tok = min(info.tokens_tok, info.token_capacity)
             if max_concurrent:
                 self.max_concurrent = max_concurrent
+            self.cv.notify_all()
 
 class RequestMonitor:
     """Monitor and track API request statistics."""
@@ -99,7 +176,9 @@ class RequestMonitor:
         self.failed_requests = 0
         self.total_tokens_used = 0
         self.avg_response_time = 0.0
-        self.request_times = []
+        # Last 100 response times with a running sum for the moving average
+        self.request_times = deque(maxlen=100)
+        self._rt_sum = 0.0
         self.start_time = time.time()
     
     def record_request(self, success: bool, tokens: int, response_time: float):
@@ -107,18 +186,19 @@ class RequestMonitor:
         with self.lock:
             self.total_requests += 1
             self.total_tokens_used += tokens
-            self.request_times.append(response_time)
             
             if success:
                 self.successful_requests += 1
             else:
                 self.failed_requests += 1
             
-            # Keep only last 100 response times for moving average
-            if len(self.request_times) > 100:
-                self.request_times.pop(0)
+            # The deque evicts the oldest sample itself; keep the sum in step
+            if len(self.request_times) == self.request_times.maxlen:
+                self._rt_sum -= self.request_times[0]
+            self.request_times.append(response_time)
+            self._rt_sum += response_time
             
-            self.avg_response_time = sum(self.request_times) / len(self.request_times)
+            self.avg_response_time = self._rt_sum / len(self.request_times)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get current statistics."""
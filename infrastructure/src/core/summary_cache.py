@@ -0,0 +1,88 @@
+"""
+Persistent LRU cache for whole-document summaries.
+Entries live in a SQLite table keyed by a 128-bit BLAKE2b digest of the input,
+and the least recently used ones are evicted once the stored bytes exceed a budget.
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Default byte budget for stored summaries
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def summary_key(*parts: str) -> bytes:
+    """128-bit digest of the NUL-joined parts."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.digest()
+
+
+class SummaryCache:
+    """Disk-backed LRU mapping digests to JSON-serializable values, bounded by total bytes."""
+
+    def __init__(self, db_path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS summaries '
+            '(key BLOB PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, atime REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS summaries_atime ON summaries(atime)')
+        self._total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM summaries').fetchone()[0]
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached value and refresh its recency, or None."""
+        with self._lock:
+            row = self._conn.execute('SELECT value FROM summaries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE summaries SET atime = ? WHERE key = ?', (time.time(), key))
+        return orjson.loads(row[0]) if ORJSON_AVAILABLE else json.loads(row[0])
+
+    def put(self, key: bytes, value: Any):
+        """Store a value, evicting least recently used entries beyond the byte budget."""
+        if ORJSON_AVAILABLE:
+            blob = orjson.dumps(value)
+        else:
+            blob = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM summaries WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO summaries (key, value, size, atime) VALUES (?, ?, ?, ?)',
+                (key, blob, len(blob), time.time())
+            )
+            self._total += len(blob) - (old[0] if old else 0)
+            if self._total > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self):
+        """Drop oldest entries until the stored bytes fit the budget."""
+        evicted = 0
+        rows = self._conn.execute('SELECT key, size FROM summaries ORDER BY atime').fetchall()
+        for key, size in rows:
+            if self._total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM summaries WHERE key = ?', (key,))
+            self._total -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} cached summaries ({self._total} bytes kept)")
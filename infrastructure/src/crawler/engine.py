@@ -8,15 +8,71 @@ import json
 import time
 import hashlib
 import logging
+import shutil
+import threading
+import functools
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 from pathlib import Path
 from datetime import datetime
-from typing import Set, List
+from typing import Set, List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .seen_store import SeenURLStore
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import lxml  # noqa: F401  (C parser backend for BeautifulSoup)
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
 
 logger = logging.getLogger(__name__)
 
+# Copy buffer for streaming PDF bodies to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 18  # 256 KiB
+
+# (href, classes, text) for each <a href> on a page, collected in one tree walk
+Anchor = Tuple[str, Tuple[str, ...], str]
+
+@functools.lru_cache(maxsize=8192)
+def _cached_join(base: str, href: str) -> str:
+    """urljoin memoized: navbars/footers repeat the same anchors on every page"""
+    return urljoin(base, href)
+
+@functools.lru_cache(maxsize=8192)
+def _pdf_filename(url: str) -> str:
+    """Stable download filename: 12 hex chars of SHA-256(url) + original basename"""
+    original_name = os.path.basename(urlparse(url).path) or "unknown.pdf"
+    url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()[:12]
+    return f"{url_hash}_{original_name}"
+
+def _host_path_key(url: str) -> Tuple[str, str]:
+    """Sort key that groups URLs by host, then path"""
+    parsed = urlparse(url)
+    return parsed.netloc, parsed.path
+
+@functools.lru_cache(maxsize=8192)
+def _cached_netloc(url: str) -> str:
+    """urlparse(url).netloc memoized"""
+    return urlparse(url).netloc
+
+# Anchor texts that mark a generic "next page" link
+_NEXT_TEXTS = frozenset(['次へ', 'Next', '>', '次へ >'])
+
+USER_AGENT = "DB4DD-Crawler/1.0 (+https://github.com/31zuk1/DB4DD)"
+
+# Safety limit for pagination depth per council page
+MAX_PAGINATION_DEPTH = 10
+
 class CrawlerEngine:
     """Core logic for the Digital Agency PDF Crawler."""
     
@@ -26,7 +82,10 @@ class CrawlerEngine:
                  state_file: Path = Path("data/crawler_state.json"),
                  max_pages: int = 200,
                  request_timeout: int = 10,
-                 sleep_interval: float = 1.0):
+                 sleep_interval: float = 1.0,
+                 max_workers: int = 16,
+                 download_workers: int = 8,
+                 per_host_concurrency: int = 2):
         
         self.entry_url = entry_url
         self.output_base_dir = output_base_dir
@@ -34,10 +93,24 @@ class CrawlerEngine:
         self.max_pages = max_pages
         self.timeout = request_timeout
         self.sleep = sleep_interval
+        self.max_workers = max_workers
+        self.download_workers = download_workers
+        self.per_host_concurrency = per_host_concurrency
         
-        self.seen_urls: Set[str] = set()
+        # Seen URLs are kept as 128-bit digests next to the (legacy JSON) state file
+        self.seen_urls = SeenURLStore(self.state_file.with_suffix('.bin'))
         self.new_pdfs_count = 0
         self.found_links_count = 0
+        # Filenames already in the output dir (one scandir instead of a stat per PDF)
+        self._existing_files: Set[str] = set()
+        
+        # Politeness: at most per_host_concurrency in-flight requests per host
+        self._host_sems: Dict[str, threading.Semaphore] = {}
+        self._host_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        
+        # Shared keep-alive session so TCP/TLS handshakes are amortized across requests
+        self.session = self._build_session()
         
         # Ensure directories exist
         self.output_base_dir.mkdir(parents=True, exist_ok=True)
@@ -46,6 +119,16 @@ class CrawlerEngine:
             
         self.load_state()
 
+    def _build_session(self) -> requests.Session:
+        """Create a pooled HTTP session with retry on transient errors"""
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
     def _get_daily_output_dir(self) -> Path:
         """Generate output directory path: data/raw/crawler_downloads/master_raw"""
         # Changed from daily dated folder to single master folder to avoid duplication
@@ -53,46 +136,76 @@ class CrawlerEngine:
         path.mkdir(parents=True, exist_ok=True)
         return path
 
+    def _index_output_dir(self, output_dir: Path):
+        """Snapshot the names of files already downloaded"""
+        with os.scandir(output_dir) as it:
+            self._existing_files = {entry.name for entry in it if entry.is_file()}
+
     def load_state(self):
-        """Load seen URLs from state file"""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.seen_urls = set(data.get("seen_urls", []))
-                logger.info(f"Loaded {len(self.seen_urls)} seen URLs from {self.state_file}")
-            except Exception as e:
-                logger.warning(f"Failed to load state file: {e}")
-                self.seen_urls = set()
-        else:
-            logger.info("No existing state file. Starting fresh.")
+        """Load seen URLs from the digest store, migrating a legacy JSON state file once"""
+        try:
+            self.seen_urls.load()
+            if len(self.seen_urls) == 0 and self.state_file.exists():
+                raw = self.state_file.read_bytes()
+                data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+                self.seen_urls.update(data.get("seen_urls", []))
+                self.seen_urls.compact()
+                logger.info(f"Migrated {len(self.seen_urls)} seen URLs from {self.state_file}")
+            elif len(self.seen_urls):
+                logger.info(f"Loaded {len(self.seen_urls)} seen URLs from {self.seen_urls.path}")
+            else:
+                logger.info("No existing state file. Starting fresh.")
+        except Exception as e:
+            logger.warning(f"Failed to load state file: {e}")
+            self.seen_urls = SeenURLStore(self.seen_urls.path)
 
     def save_state(self):
-        """Save seen URLs to state file"""
+        """Append URLs seen during this run to the digest store (no-op if nothing changed)"""
+        if not self.seen_urls.dirty:
+            return
         try:
-            data = {"seen_urls": list(self.seen_urls)}
-            with open(self.state_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.info(f"Saved state to {self.state_file}")
+            self.seen_urls.flush()
+            logger.info(f"Saved state to {self.seen_urls.path}")
         except Exception as e:
             logger.error(f"Failed to save state: {e}")
 
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        """Return the politeness semaphore for the URL's host"""
+        host = _cached_netloc(url)
+        with self._host_lock:
+            sem = self._host_sems.get(host)
+            if sem is None:
+                sem = threading.Semaphore(self.per_host_concurrency)
+                self._host_sems[host] = sem
+        return sem
+
     def get_soup(self, url: str) -> BeautifulSoup:
         """Fetch URL and return BeautifulSoup object"""
-        response = requests.get(url, timeout=self.timeout)
+        with self._host_slot(url):
+            # Be polite: the courtesy interval is spent while holding the host slot
+            time.sleep(self.sleep)
+            response = self.session.get(url, timeout=self.timeout)
         response.raise_for_status()
-        return BeautifulSoup(response.content, 'html.parser')
+        return BeautifulSoup(response.content, HTML_PARSER)
 
     def is_target_domain(self, url: str) -> bool:
         """Check if URL belongs to digital.go.jp"""
-        return "digital.go.jp" in urlparse(url).netloc
+        # Cheap substring reject first; the netloc check guards against the name in path/query
+        return "digital.go.jp" in url and "digital.go.jp" in _cached_netloc(url)
+
+    @staticmethod
+    def _extract_anchors(soup: BeautifulSoup) -> List[Anchor]:
+        """Walk all anchors once so the link extractors can share the result"""
+        return [
+            (a['href'], tuple(a.get('class', ())), a.get_text(strip=True))
+            for a in soup.select('a[href]')
+        ]
 
-    def get_detail_pages(self, soup: BeautifulSoup) -> List[str]:
+    def get_detail_pages(self, anchors: List[Anchor]) -> List[str]:
         """Extract detail page URLs from the entry page"""
         detail_urls = set()
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            full_url = urljoin(self.entry_url, href)
+        for href, _, _ in anchors:
+            full_url = _cached_join(self.entry_url, href)
             
             # Simple filter for council pages: contains '/councils/' and is not a file
             if (self.is_target_domain(full_url) and 
@@ -105,34 +218,39 @@ class CrawlerEngine:
         
         return list(detail_urls)
 
-    def extract_pdf_links(self, soup: BeautifulSoup, page_url: str) -> List[str]:
-        """Extract PDF URLs from a page"""
+    def _scan_links(self, anchors: List[Anchor], page_url: str,
+                    want_meetings: bool = True) -> Tuple[List[str], List[str]]:
+        """One pass over a page's anchors: return (pdf_urls, meeting_page_urls)"""
         pdf_urls = set()
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            # Basic PDF detection
-            if href.lower().endswith('.pdf'):
-                full_url = urljoin(page_url, href)
-                if self.is_target_domain(full_url):
-                    pdf_urls.add(full_url)
-        return list(pdf_urls)
+        meeting_urls = set()
+        prefix_len = len(page_url)
+        for href, _, _ in anchors:
+            is_pdf_href = href.lower().endswith('.pdf')
+            if not (is_pdf_href or want_meetings):
+                continue
+            full_url = _cached_join(page_url, href)
+            if not self.is_target_domain(full_url):
+                continue
+            if is_pdf_href:
+                pdf_urls.add(full_url)
+            # Meeting page criteria: child path of page_url, not itself, not a PDF
+            elif (full_url[:prefix_len] == page_url and
+                  len(full_url) != prefix_len and
+                  not full_url.lower().endswith('.pdf')):
+                meeting_urls.add(full_url)
+        return list(pdf_urls), list(meeting_urls)
+
+    def extract_pdf_links(self, anchors: List[Anchor], page_url: str) -> List[str]:
+        """Extract PDF URLs from a page"""
+        return self._scan_links(anchors, page_url, want_meetings=False)[0]
 
     def download_pdf(self, url: str, output_dir: Path):
         """Download a single PDF"""
         try:
-            # Generate unique filename
-            parsed = urlparse(url)
-            original_name = os.path.basename(parsed.path)
-            if not original_name:
-                original_name = "unknown.pdf"
-                
-            # Create prefix hash
-            url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()[:12]
-            filename = f"{url_hash}_{original_name}"
-            
+            filename = _pdf_filename(url)
             save_path = output_dir / filename
             
-            if save_path.exists():
+            if filename in self._existing_files:
                 logger.info(f"[SKIP] Already exists: {filename}")
                 self.seen_urls.add(url)
                 return
@@ -140,80 +258,155 @@ class CrawlerEngine:
             logger.info(f"[DL] Downloading: {url} -> {filename}")
             
             # Stream download
-            with requests.get(url, stream=True, timeout=self.timeout) as r:
-                r.raise_for_status()
-                with open(save_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            with self._host_slot(url):
+                time.sleep(self.sleep)
+                with self.session.get(url, stream=True, timeout=self.timeout) as r:
+                    r.raise_for_status()
+                    # Read the raw stream directly; let urllib3 undo any gzip/deflate
+                    r.raw.decode_content = True
+                    with open(save_path, 'wb') as f:
+                        if hasattr(os, 'posix_fadvise'):
+                            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                        shutil.copyfileobj(r.raw, f, length=DOWNLOAD_CHUNK_SIZE)
             
             # Update state on success
             self.seen_urls.add(url)
-            self.new_pdfs_count += 1
+            self._existing_files.add(filename)
+            with self._count_lock:
+                self.new_pdfs_count += 1
             
         except Exception as e:
             logger.error(f"[ERR] Failed to download {url}: {e}")
 
-    def get_meeting_pages(self, soup: BeautifulSoup, council_url: str) -> List[str]:
+    def get_meeting_pages(self, anchors: List[Anchor], council_url: str) -> List[str]:
         """Extract meeting page URLs (sub-pages) from a council page"""
-        meeting_urls = set()
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            full_url = urljoin(council_url, href)
-            
-            # Meeting page criteria:
-            # 1. Be on same domain
-            # 2. Start with council_url (child path)
-            # 3. Not be the council url itself
-            # 4. Not be a PDF
-            if (self.is_target_domain(full_url) and 
-                full_url.startswith(council_url) and 
-                full_url != council_url and
-                not full_url.lower().endswith('.pdf')):
-                meeting_urls.add(full_url)
-        return list(meeting_urls)
+        return self._scan_links(anchors, council_url)[1]
 
-    def get_pagination_next(self, soup: BeautifulSoup, current_url: str) -> str:
+    def get_pagination_next(self, soup: BeautifulSoup, current_url: str, anchors: List[Anchor] = None) -> str:
         """Find the 'Next' page URL from pagination."""
         # 1. <link rel="next"> (Head)
-        link_next = soup.find('link', rel='next')
-        if link_next and link_next.get('href'):
-            return urljoin(current_url, link_next.get('href'))
+        link_next = soup.select_one('link[rel~="next"][href]')
+        if link_next:
+            return _cached_join(current_url, link_next['href'])
             
         # 2. Drupal Pager (.pager__item--next > a)
-        next_item = soup.find('li', class_='pager__item--next')
-        if next_item:
-            a = next_item.find('a', href=True)
-            if a:
-                return urljoin(current_url, a['href'])
+        a = soup.select_one('li.pager__item--next a[href]')
+        if a:
+            return _cached_join(current_url, a['href'])
         
         # 3. Generic "Next" text or class
         # Look for <a> with class containing "next" or text "次へ"
-        for a in soup.find_all('a', href=True):
+        if anchors is None:
+            anchors = self._extract_anchors(soup)
+        for href, classes, text in anchors:
             # Class check
-            classes = a.get('class', [])
-            if any('next' in c.lower() for c in classes):
-                return urljoin(current_url, a['href'])
+            if classes and 'next' in ' '.join(classes).lower():
+                return _cached_join(current_url, href)
             
             # Text check (careful with this)
-            text = a.get_text(strip=True)
-            if text in ['次へ', 'Next', '>', '次へ >']:
-                return urljoin(current_url, a['href'])
+            if text in _NEXT_TEXTS:
+                return _cached_join(current_url, href)
                 
         return None
 
+    def _process_page(self, soup: BeautifulSoup, page_url: str, kind: str, depth: int,
+                      all_pdfs: Set[str]) -> List[Tuple[str, str, int]]:
+        """Collect PDFs from a fetched page and return follow-up (url, kind, depth) work"""
+        anchors = self._extract_anchors(soup)
+        pdfs, meeting_pages = self._scan_links(anchors, page_url, want_meetings=(kind != 'meeting'))
+        all_pdfs.update(pdfs)
+        
+        if kind == 'meeting':
+            return []
+        
+        if kind == 'listing':
+            self.seen_urls.add(page_url)
+        
+        follow_ups = []
+        
+        # Pagination Handling; queued before the meeting pages because a child-path
+        # next link (e.g. ?page=2) also matches the meeting page criteria
+        next_url = self.get_pagination_next(soup, page_url, anchors)
+        if next_url and next_url not in self.seen_urls and self.is_target_domain(next_url):
+            # Continuation pages past the council page: the first is depth 2, so up to
+            # MAX_PAGINATION_DEPTH + 1 listing pages are read, as the original loop did
+            if depth > MAX_PAGINATION_DEPTH:
+                logger.info(f"  [INFO] Reached pagination limit of {MAX_PAGINATION_DEPTH} pages for {page_url}")
+            else:
+                logger.info(f"  -> Following pagination (Page {depth+1}): {next_url}")
+                follow_ups.append((next_url, 'listing', depth + 1))
+                if next_url in meeting_pages:
+                    meeting_pages.remove(next_url)
+        
+        # Meeting pages (sub-pages); duplicates across councils are dropped by the frontier
+        follow_ups.extend((mp_url, 'meeting', depth) for mp_url in meeting_pages)
+        logger.info(f"  {page_url}: {len(pdfs)} PDFs, {len(meeting_pages)} meeting pages")
+        
+        return follow_ups
+
+    def _crawl(self, soup: BeautifulSoup, crawl_list: List[str]) -> Set[str]:
+        """Crawl council, pagination and meeting pages concurrently; return PDF URLs found"""
+        all_pdfs: Set[str] = set()
+        # Every URL scheduled in this crawl and its kind; submit() is the single dedupe point
+        frontier: Dict[str, str] = {self.entry_url: 'council'}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+            in_flight: Dict[str, object] = {}
+            
+            def submit(url: str, kind: str, depth: int):
+                if url in frontier:
+                    # A numbered pager link can be queued as a meeting page before the
+                    # previous listing page names it as 'next'; listing takes it over
+                    if not (kind == 'listing' and frontier[url] == 'meeting'):
+                        return
+                    frontier[url] = kind
+                    future = in_flight.get(url)
+                    if future in pending:
+                        pending[future] = (url, kind, depth)
+                        return
+                frontier[url] = kind
+                future = executor.submit(self.get_soup, url)
+                in_flight[url] = future
+                pending[future] = (url, kind, depth)
+            
+            # Councils first, so a council linked from the entry page is not claimed as a meeting page
+            for page_url in crawl_list:
+                submit(page_url, 'council', 1)
+            # Entry page is already fetched
+            for follow_up in self._process_page(soup, self.entry_url, 'council', 1, all_pdfs):
+                submit(*follow_up)
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url, kind, depth = pending.pop(future)
+                    in_flight.pop(page_url, None)
+                    try:
+                        page_soup = future.result()
+                        follow_ups = self._process_page(page_soup, page_url, kind, depth, all_pdfs)
+                    except Exception as e:
+                        logger.warning(f"[WARN] Error crawling {kind} {page_url}: {e}")
+                        continue
+                    for follow_up in follow_ups:
+                        submit(*follow_up)
+        
+        return all_pdfs
+
     def run(self):
         """Main execution flow"""
         output_dir = self._get_daily_output_dir()
         
         logger.info(f"Starting crawl at: {self.entry_url}")
         logger.info(f"Output directory: {output_dir}")
+        self._index_output_dir(output_dir)
         
         try:
             # 1. Fetch Entry Page
             soup = self.get_soup(self.entry_url)
             
             # 2. Extract detail pages (Councils)
-            detail_pages = self.get_detail_pages(soup)
+            detail_pages = self.get_detail_pages(self._extract_anchors(soup))
             logger.info(f"Found {len(detail_pages)} council pages.")
             
             # Limit pages
@@ -222,122 +415,24 @@ class CrawlerEngine:
             # Add entry page itself
             crawl_list.insert(0, self.entry_url)
             
-            all_pdfs = set()
-            processed_urls = set() # Track visited meeting pages to avoid dupes across councils if any
+            # 3. Crawl council, pagination and meeting pages
+            all_pdfs = self._crawl(soup, crawl_list)
             
-            # 3. Crawl each page
-            for i, page_url in enumerate(crawl_list):
-                try:
-                    logger.info(f"Crawling Council ({i+1}/{len(crawl_list)}): {page_url}")
-                    
-                    if page_url != self.entry_url:
-                        page_soup = self.get_soup(page_url)
-                    else:
-                        page_soup = soup
-                    
-                    # 1. PDFs on the council top page (e.g. latest materials)
-                    pdfs = self.extract_pdf_links(page_soup, page_url)
-                    
-                    # 2. Find Meeting Pages (sub-pages)
-                    meeting_pages = self.get_meeting_pages(page_soup, page_url)
-                    logger.info(f"  > Found {len(meeting_pages)} meeting pages")
-                    
-                    # 3. Crawl Meeting Pages
-                    for mp_url in meeting_pages:
-                        if mp_url in processed_urls:
-                            continue
-                        processed_urls.add(mp_url)
-                        
-                        try:
-                            # Be polite
-                            time.sleep(self.sleep)
-                            
-                            mp_soup = self.get_soup(mp_url)
-                            mp_pdfs = self.extract_pdf_links(mp_soup, mp_url)
-                            pdfs.extend(mp_pdfs)
-                            # logger.info(f"    - {mp_url} : {len(mp_pdfs)} PDFs")
-                        except Exception as e:
-                            logger.warning(f"[WARN] Error crawling meeting {mp_url}: {e}")
-                    
-                    # Filter already seen
-                    new_found = [u for u in pdfs if u not in self.seen_urls]
-                    logger.info(f"  Found {len(pdfs)} PDFs total (New: {len(new_found)})")
-                    
-                    all_pdfs.update(new_found)
-                    
-                    # Be polite
-                    time.sleep(self.sleep)
-                    
-                except Exception as e:
-                    logger.warning(f"[WARN] Error crawling council {page_url}: {e}")
-                    continue
-
-                # --- Pagination Handling ---
-                try:
-                    current_page_url = page_url
-                    current_soup = page_soup
-                    page_count = 1
-                    
-                    while True:
-                        next_url = self.get_pagination_next(current_soup, current_page_url)
-                        if not next_url or next_url in self.seen_urls:
-                            break
-                        
-                        # Verify domain
-                        if not self.is_target_domain(next_url):
-                            break
-                            
-                        logger.info(f"  -> Following pagination (Page {page_count+1}): {next_url}")
-                        
-                        # Crawl Next Page
-                        time.sleep(self.sleep)
-                        current_page_url = next_url
-                        current_soup = self.get_soup(current_page_url)
-                        self.seen_urls.add(current_page_url)
-                        
-                        # 1. PDFs on this page
-                        pdfs_next = self.extract_pdf_links(current_soup, current_page_url)
-                        
-                        # 2. Meeting Pages on this page
-                        meeting_pages_next = self.get_meeting_pages(current_soup, current_page_url)
-                        
-                        # Process PDFs
-                        new_found_next = [u for u in pdfs_next if u not in all_pdfs] # check against current batch set
-                        all_pdfs.update(new_found_next)
-                        logger.info(f"     Found {len(new_found_next)} new PDFs on page {page_count+1}")
-                        
-                        # Process Meetings
-                        for mp_url in meeting_pages_next:
-                            if mp_url in processed_urls:
-                                continue
-                            processed_urls.add(mp_url)
-                            try:
-                                time.sleep(self.sleep)
-                                mp_soup = self.get_soup(mp_url)
-                                mp_pdfs = self.extract_pdf_links(mp_soup, mp_url)
-                                all_pdfs.update(mp_pdfs)
-                            except Exception as e:
-                                logger.warning(f"     [WARN] Error meeting {mp_url}: {e}")
-                        
-                        page_count += 1
-                        if page_count > 10: # Safety limit for pagination depth
-                            logger.info(f"  [INFO] Reached pagination limit of 10 pages for {page_url}")
-                            break
-                            
-                except Exception as e:
-                    logger.warning(f"[WARN] Error handling pagination for {page_url}: {e}")
+            # Filter already seen; group by host so pooled keep-alive connections are reused
+            new_pdfs = sorted((u for u in all_pdfs if u not in self.seen_urls), key=_host_path_key)
+            logger.info(f"Found {len(all_pdfs)} PDFs total (New: {len(new_pdfs)})")
             
             # 4. Download new PDFs
-            self.found_links_count = len(all_pdfs)
+            self.found_links_count = len(new_pdfs)
             logger.info(f"Total new PDFs to download: {self.found_links_count}")
             
-            for pdf_url in all_pdfs:
-                self.download_pdf(pdf_url, output_dir)
-                time.sleep(self.sleep)
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                list(executor.map(lambda u: self.download_pdf(u, output_dir), new_pdfs))
                 
         except Exception as e:
             logger.critical(f"Critical error during execution: {e}")
         finally:
+            self.session.close()
             self.save_state()
             logger.info("="*30)
             logger.info("Execution finished.")
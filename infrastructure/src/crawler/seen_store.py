@@ -0,0 +1,94 @@
+"""
+Compact persistent set of seen URLs for the crawler.
+URLs are stored as fixed-size 128-bit digests in an append-only binary file;
+new digests are buffered in memory and appended in one batch per flush.
+"""
+
+import os
+import mmap
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+# Bytes per stored digest (128-bit)
+DIGEST_SIZE = 16
+
+
+def url_digest(url: str) -> bytes:
+    """128-bit digest of a URL (stdlib BLAKE2b so the on-disk format never depends on optional packages)"""
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+class SeenURLStore:
+    """Set-like store of seen URLs backed by an append-only digest file.
+
+    Supports the subset of the set API the crawler uses: ``in``, ``add`` and ``len``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._digests = set()
+        self._pending = []  # Digests added since the last flush
+        self._lock = threading.Lock()
+
+    def __contains__(self, url: str) -> bool:
+        return url_digest(url) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    @property
+    def dirty(self) -> bool:
+        """True when there are digests not yet written to disk"""
+        return bool(self._pending)
+
+    def add(self, url: str):
+        """Record a URL; its digest is written on the next flush"""
+        digest = url_digest(url)
+        with self._lock:
+            if digest in self._digests:
+                return
+            self._digests.add(digest)
+            self._pending.append(digest)
+
+    def update(self, urls: Iterable[str]):
+        """Record several URLs"""
+        for url in urls:
+            self.add(url)
+
+    def load(self):
+        """Load digests from the backing file"""
+        self._digests = set()
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            end = size - size % DIGEST_SIZE
+            self._digests = {mm[i:i + DIGEST_SIZE] for i in range(0, end, DIGEST_SIZE)}
+        if end != size:
+            # Drop a torn trailing record so later appends stay aligned
+            logger.warning(f"Truncating torn record in {self.path}")
+            os.truncate(self.path, end)
+
+    def flush(self):
+        """Append all pending digests to the backing file in a single write"""
+        with self._lock:
+            if not self._pending:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(self._pending))
+            self._pending.clear()
+
+    def compact(self):
+        """Atomically rewrite the backing file with exactly the in-memory digests"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            tmp_path.write_bytes(b''.join(self._digests))
+            tmp_path.replace(self.path)
+            self._pending.clear()
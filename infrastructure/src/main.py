@@ -6,14 +6,22 @@ Groups PDFs by meeting session and creates one markdown file per session.
 """
 import os
 import sys
+import shutil
 import argparse
 import logging
+import time
+import threading
+import functools
+import multiprocessing
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from dotenv import load_dotenv
 from tqdm import tqdm
 from datetime import datetime
-import json
-from collections import defaultdict
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
 from typing import Dict, List
 
 # Load environment variables
@@ -24,23 +32,39 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 # Import our modules
 from core.rate_limiter import AdaptiveRateLimiter, RequestMonitor
-from core.api_client import APIClient
-from processing.pdf_processor import PDFProcessor
-from processing.text_summarizer import TextSummarizer
-from output.markdown_generator import MarkdownGenerator
 from utils.file_utils_enhanced import (
     EnhancedProcessedDatabase, 
     EnhancedFileParser,
     find_pdfs_enhanced,
     FileMetadata
 )
-from utils.file_utils import cleanup_cache
+from utils.file_utils import cleanup_cache, dump_json
+
+class _TqdmConsoleHandler(logging.StreamHandler):
+    """Console handler that prints through tqdm, so records appear above an active progress bar."""
+    
+    def emit(self, record):
+        try:
+            tqdm.write(self.format(record), file=self.stream)
+        except Exception:
+            self.handleError(record)
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s - %(message)s'
+
+def _start_logging() -> QueueListener:
+    """Initialize logging: callers only enqueue records; a background listener formats and writes them.
+    
+    Called from main() only, so extraction processes re-importing this module never install a
+    queue nobody drains (they configure their own handler in init_worker).
+    """
+    console_handler = _TqdmConsoleHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    return listener
 
-# Initialize logging
-logging.basicConfig(
-    level=logging.INFO, 
-    format='%(asctime)s %(levelname)s %(name)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Configuration from environment
@@ -50,11 +74,61 @@ DATA_ROOT = Path(os.getenv('DATA_ROOT', PROJECT_ROOT / 'data'))
 BASE_VAULT_ROOT = Path(os.getenv('VAULT_ROOT', PROJECT_ROOT / 'vaults'))
 CACHE_DIR = Path(os.getenv('CACHE_DIR', PROJECT_ROOT / '.cache'))
 CHUNK_SIZE = int(os.getenv('CHUNK_CHARS', '2000'))
-MAX_WORKERS = int(os.getenv('MAX_WORKERS', '4'))
+# Extraction processes; unset = one per core (capped by WORKER_CAP)
+MAX_WORKERS = int(os.getenv('MAX_WORKERS', '0')) or os.cpu_count() or 4
+# Concurrent sessions in the API stage; unset = match the rate limiter's concurrency cap
+API_WORKERS = int(os.getenv('API_WORKERS', '0')) or None
+# Seconds between API status log lines during processing
+STATUS_LOG_INTERVAL = 10.0
+# Upper bound on extraction processes, regardless of --workers
+WORKER_CAP = 16
+# Threads unlinking a cleared vault in the background
+TRASH_WORKERS = 8
+# Threads listing and writing ministry index files
+INDEX_WORKERS = 8
+
+def _extract_mp_context():
+    """Start extraction workers from a fork server where available.
+    
+    The parent already runs background threads (processed-DB flusher, vault cleanup),
+    and forking it directly could copy a lock held mid-operation into a worker.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context()
+
+def _remove_tree(root: Path):
+    """Delete a directory tree, unlinking files from a thread pool (errors are ignored)."""
+    files, dirs = [], []
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        files.extend(os.path.join(dirpath, name) for name in filenames)
+        for name in dirnames:
+            path = os.path.join(dirpath, name)
+            # os.walk lists symlinks to directories as directories; they are unlinked, not followed
+            (files if os.path.islink(path) else dirs).append(path)
+    
+    def unlink(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    with ThreadPoolExecutor(max_workers=TRASH_WORKERS, thread_name_prefix='vault-trash') as pool:
+        for _ in pool.map(unlink, files, chunksize=64):
+            pass
+    # Bottom-up walk order: children are removed before their parents
+    for path in dirs:
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+    # Anything left over (e.g. files created during the walk) goes the slow way
+    shutil.rmtree(root, ignore_errors=True)
 
 # Generate date-based vault directory
-def get_default_vault_root():
-    """Generate vault root with today's date folder."""
+@functools.cache
+def get_default_vault_root() -> Path:
+    """Generate vault root with today's date folder (resolved once, on first use)."""
     # Use environment variable if set, otherwise default to DB_{YYYYMMDD}
     if os.getenv('VAULT_DATE'):
         vault_date = os.getenv('VAULT_DATE')
@@ -63,7 +137,134 @@ def get_default_vault_root():
         today = datetime.now().strftime('%Y%m%d')
         return BASE_VAULT_ROOT / f"{today}"
 
-VAULT_ROOT = get_default_vault_root()
+# Obsidian vault configuration (basic app.json and workspace layout)
+OBSIDIAN_APP_CONFIG = {
+    "legacyEditor": False,
+    "livePreview": True,
+    "defaultViewMode": "preview",
+    "showFrontmatter": True,
+    "showLineNumber": True,
+    "spellcheck": True,
+    "useTab": False,
+    "tabSize": 2
+}
+
+OBSIDIAN_WORKSPACE_CONFIG = {
+    "main": {
+        "id": "main",
+        "type": "split",
+        "children": [{
+            "id": "root",
+            "type": "leaf",
+            "state": {
+                "type": "markdown",
+                "state": {
+                    "file": "index.md",
+                    "mode": "preview"
+                }
+            }
+        }],
+        "direction": "vertical"
+    },
+    "left": {
+        "id": "left",
+        "type": "split",
+        "children": [{
+            "id": "file-explorer",
+            "type": "leaf",
+            "state": {
+                "type": "file-explorer",
+                "state": {}
+            }
+        }],
+        "direction": "horizontal",
+        "width": 300
+    },
+    "active": "root"
+}
+
+_OBSIDIAN_APP_JSON = dump_json(OBSIDIAN_APP_CONFIG)
+_OBSIDIAN_WORKSPACE_JSON = dump_json(OBSIDIAN_WORKSPACE_CONFIG)
+
+def _summary_text(summary) -> str:
+    """Text of one PDF's summary: the 'summary' field of a summary dict, else the value itself."""
+    if isinstance(summary, dict) and 'summary' in summary:
+        summary = summary['summary']
+    return summary if isinstance(summary, str) else str(summary)
+
+def _render_session_markdown(meta_key: tuple, pdf_names: tuple, summary_texts: tuple) -> str:
+    """Render a session note from its metadata key, PDF names and summary texts."""
+    meeting_name, round_num, formatted_date, meta_ministry, fiscal_year = meta_key
+    ministry = meta_ministry or 'Unknown'
+    
+    # デジタル庁形式のフロントマター: date (クォート付き), meeting, round (数値のまま), source_pdf
+    frontmatter = ''
+    if formatted_date:
+        frontmatter += f"date: '{formatted_date}'\n"
+    if meeting_name:
+        frontmatter += f"meeting: {meeting_name}\n"
+    if round_num:
+        round_val = int(round_num) if round_num.isdigit() else round_num
+        frontmatter += f"round: {round_val}\n"
+    if pdf_names:
+        frontmatter += f"source_pdf: {pdf_names[0]}\n"
+    
+    # tags (配列形式): 省庁 + 会議名から生成した簡易名
+    tags = [meta_ministry] if meta_ministry else []
+    if meeting_name:
+        simple_name = meeting_name.split('_')[0]
+        if simple_name != meta_ministry:
+            tags.append(simple_name)
+    
+    # Title
+    title_parts = [meeting_name] if meeting_name else []
+    if round_num:
+        title_parts.append(f"第{round_num}回")
+    if formatted_date:
+        title_parts.append(formatted_date)
+    elif fiscal_year:
+        title_parts.append(f"{fiscal_year}年度")
+    
+    # Combined summary from all individual summaries
+    combined = "\n\n---\n\n".join(summary_texts) if summary_texts else "要約の生成に失敗しました。"
+    
+    details = ''.join(
+        f"### {i}. {name}\n\n{text}\n\n"
+        for i, (name, text) in enumerate(zip(pdf_names, summary_texts), 1)
+    )
+    
+    tags_block = "tags:\n" + ''.join(f"- {tag}\n" for tag in tags) if tags else ''
+    round_info = f"- **回次**: 第{round_num}回\n" if round_num else ''
+    date_info = f"- **開催日**: {formatted_date}\n" if formatted_date else ''
+    file_list = ''.join(f"{i}. {name}\n" for i, name in enumerate(pdf_names, 1))
+    meeting_link = f"- [[{meeting_name}]]\n" if meeting_name else ''
+    
+    # Whole note as one f-string; optional lines above are pre-rendered (with their newline) or empty
+    return f"""---
+{frontmatter}status: completed
+{tags_block}---
+
+# {' - '.join(title_parts)}
+
+## 📋 基本情報
+
+- **省庁**: {ministry}
+- **会議名**: {meeting_name or 'Unknown'}
+{round_info}{date_info}- **資料ファイル数**: {len(pdf_names)}
+
+## 📄 資料一覧
+
+{file_list}
+## 📝 統合要約
+
+{combined}
+
+## 📑 資料詳細
+
+{details}## 🔗 関連リンク
+
+- [[{ministry}]]
+{meeting_link}"""
 
 class SessionGroup:
     """Represents a group of PDFs from the same meeting session."""
@@ -80,6 +281,16 @@ class SessionGroup:
         if self.metadata is None:
             self.metadata = pdf_wrapper.metadata
     
+    def total_size(self) -> int:
+        """Total size in bytes of the session's PDFs (a proxy for processing time)."""
+        size = 0
+        for pdf_wrapper in self.pdfs:
+            try:
+                size += pdf_wrapper.path.stat().st_size
+            except OSError:
+                pass
+        return size
+    
     def get_session_name(self) -> str:
         """Get the session name for output filename."""
         if self.metadata:
@@ -89,7 +300,7 @@ class SessionGroup:
             if self.metadata.round_num:
                 parts.append(f"第{self.metadata.round_num}回")
             if self.metadata.date:
-                formatted_date = self.metadata.get_formatted_date()
+                formatted_date = self.metadata.formatted_date
                 if formatted_date:
                     parts.append(formatted_date)
             return "_".join(parts)
@@ -100,15 +311,12 @@ class SessionBasedGovMeetTracker:
     
     def __init__(self, args):
         self.args = args
+        self.vault_root = get_default_vault_root()
         
-        # Initialize core components
+        # Initialize core components (API/processing components are built lazily,
+        # so --dry-run never imports the OpenAI SDK or PDF libraries)
         self.rate_limiter = AdaptiveRateLimiter()
         self.monitor = RequestMonitor()
-        self.api_client = APIClient(CACHE_DIR, self.rate_limiter, self.monitor)
-        self.pdf_processor = PDFProcessor()
-        self.text_summarizer = TextSummarizer(self.api_client, CHUNK_SIZE)
-        self.markdown_generator = MarkdownGenerator()
-        self.processed_db = EnhancedProcessedDatabase(CACHE_DIR / 'processed_sessions.json')
         self.file_parser = EnhancedFileParser()
         
         # Statistics tracking
@@ -119,12 +327,46 @@ class SessionBasedGovMeetTracker:
             'processed_pdfs': 0,
             'skipped_sessions': 0,
             'errors': 0,
-            'by_ministry': {},
+            'by_ministry': Counter(),
         }
+        # Sessions run concurrently; guards stats counters and output filename selection
+        self._lock = threading.Lock()
+        # File names per output directory, from one mkdir + scandir on first use;
+        # names chosen this run are added so concurrent sessions never collide
+        self._dir_names: Dict[Path, set] = {}
+        self._next_suffix: Dict[tuple, int] = {}
+        # Output directory per ministry, built once so every session reuses the same Path
+        self._ministry_dirs: Dict[str, Path] = {}
+        # CPU-bound text extraction runs in worker processes (created in run())
+        self._extract_pool: ProcessPoolExecutor = None
+        # Per-PDF summaries run on their own threads so session workers never wait on each other
+        self._summary_pool: ThreadPoolExecutor = None
+        self._extract_text = None
+        # Extraction futures per session key, queued by run() until a session worker takes them
+        self._text_futures: Dict[str, List[Future]] = {}
         
         # Configure rate limiting based on arguments
         self._configure_rate_limiting()
     
+    @functools.cached_property
+    def api_client(self):
+        from core.api_client import APIClient
+        return APIClient(CACHE_DIR, self.rate_limiter, self.monitor, http2=self.args.http2)
+    
+    @functools.cached_property
+    def text_summarizer(self):
+        from processing.text_summarizer import TextSummarizer
+        return TextSummarizer(self.api_client, CHUNK_SIZE)
+    
+    @functools.cached_property
+    def markdown_generator(self):
+        from output.markdown_generator import MarkdownGenerator
+        return MarkdownGenerator()
+    
+    @functools.cached_property
+    def processed_db(self) -> EnhancedProcessedDatabase:
+        return EnhancedProcessedDatabase(CACHE_DIR / 'processed_sessions.json')
+    
     def _configure_rate_limiting(self):
         """Configure rate limiting based on command line arguments."""
         if self.args.aggressive:
@@ -143,67 +385,18 @@ class SessionBasedGovMeetTracker:
     
     def setup_vault_structure(self):
         """Set up the Obsidian vault structure."""
-        logger.info(f"Setting up vault structure at: {VAULT_ROOT}")
+        logger.info(f"Setting up vault structure at: {self.vault_root}")
         
         # Create main vault directory
-        VAULT_ROOT.mkdir(parents=True, exist_ok=True)
+        self.vault_root.mkdir(parents=True, exist_ok=True)
         
         # Create .obsidian directory with basic configuration
-        obsidian_dir = VAULT_ROOT / '.obsidian'
+        obsidian_dir = self.vault_root / '.obsidian'
         obsidian_dir.mkdir(exist_ok=True)
         
-        # Create basic app.json
-        app_config = {
-            "legacyEditor": False,
-            "livePreview": True,
-            "defaultViewMode": "preview",
-            "showFrontmatter": True,
-            "showLineNumber": True,
-            "spellcheck": True,
-            "useTab": False,
-            "tabSize": 2
-        }
-        (obsidian_dir / 'app.json').write_text(
-            json.dumps(app_config, ensure_ascii=False, indent=2)
-        )
-        
-        # Create workspace configuration
-        workspace_config = {
-            "main": {
-                "id": "main",
-                "type": "split",
-                "children": [{
-                    "id": "root",
-                    "type": "leaf",
-                    "state": {
-                        "type": "markdown",
-                        "state": {
-                            "file": "index.md",
-                            "mode": "preview"
-                        }
-                    }
-                }],
-                "direction": "vertical"
-            },
-            "left": {
-                "id": "left",
-                "type": "split",
-                "children": [{
-                    "id": "file-explorer",
-                    "type": "leaf",
-                    "state": {
-                        "type": "file-explorer",
-                        "state": {}
-                    }
-                }],
-                "direction": "horizontal",
-                "width": 300
-            },
-            "active": "root"
-        }
-        (obsidian_dir / 'workspace.json').write_text(
-            json.dumps(workspace_config, ensure_ascii=False, indent=2)
-        )
+        # Obsidian config is constant; write the pre-serialized bytes
+        (obsidian_dir / 'app.json').write_bytes(_OBSIDIAN_APP_JSON)
+        (obsidian_dir / 'workspace.json').write_bytes(_OBSIDIAN_WORKSPACE_JSON)
         
         logger.info("Vault structure created successfully")
     
@@ -214,13 +407,23 @@ class SessionBasedGovMeetTracker:
     
     def clear_vault(self):
         """Clear the vault and processed database."""
+        # Trash left behind by a run killed before its background delete finished
+        vaults_dir = self.vault_root.parent
+        trash_dirs = [path for path in vaults_dir.glob('*.trash-*') if path.is_dir()] if vaults_dir.is_dir() else []
+        if trash_dirs:
+            logger.info(f"Removing {len(trash_dirs)} leftover vault trash directories")
         if self.args.clean:
-            if VAULT_ROOT.exists():
-                import shutil
-                shutil.rmtree(VAULT_ROOT)
-                logger.info(f"Cleared vault: {VAULT_ROOT}")
+            if self.vault_root.exists():
+                # Rename is instant; the old tree is deleted in the background while processing runs
+                trash = self.vault_root.with_name(f"{self.vault_root.name}.trash-{os.getpid()}")
+                self.vault_root.rename(trash)
+                trash_dirs.append(trash)
+                logger.info(f"Cleared vault: {self.vault_root}")
             self.processed_db.clear()
             logger.info("Cleared processed database")
+        # Non-daemon, so a normal exit waits for the delete to finish
+        for trash in trash_dirs:
+            threading.Thread(target=_remove_tree, args=(trash,), name='vault-trash').start()
     
     def group_pdfs_by_session(self) -> Dict[str, SessionGroup]:
         """Group PDFs by meeting session (folder)."""
@@ -235,7 +438,8 @@ class SessionBasedGovMeetTracker:
             logger.error(f"No PDFs found in {DATA_ROOT}")
             return {}
         
-        sessions = defaultdict(lambda: None)
+        sessions: Dict[str, SessionGroup] = {}
+        by_ministry = self.stats['by_ministry']
         
         for pdf_wrapper in pdfs:
             # Get the session directory (parent of the PDF)
@@ -243,252 +447,239 @@ class SessionBasedGovMeetTracker:
             session_key = session_dir.name
             
             # Create session group if it doesn't exist
-            if sessions[session_key] is None:
-                sessions[session_key] = SessionGroup(session_key, session_dir)
+            group = sessions.get(session_key)
+            if group is None:
+                group = sessions[session_key] = SessionGroup(session_key, session_dir)
+                # The first PDF's metadata becomes the session's, so count the session by it here
+                meta = pdf_wrapper.metadata
+                if meta and meta.ministry:
+                    by_ministry[meta.ministry] += 1
             
             # Add PDF to the session
-            sessions[session_key].add_pdf(pdf_wrapper)
+            group.add_pdf(pdf_wrapper)
         
         self.stats['total_sessions'] = len(sessions)
         self.stats['total_pdfs'] = len(pdfs)
         
-        # Count by ministry
-        for session in sessions.values():
-            if session.metadata and session.metadata.ministry:
-                ministry = session.metadata.ministry
-                self.stats['by_ministry'][ministry] = self.stats['by_ministry'].get(ministry, 0) + 1
-        
         logger.info(f"Found {len(sessions)} sessions with {len(pdfs)} PDFs total")
-        return dict(sessions)
+        return sessions
     
     def dry_run(self, sessions: Dict[str, SessionGroup]):
         """Show what would be processed without actually processing."""
         if self.args.dry_run:
             logger.info("Dry run mode - showing what would be processed:")
-            print("\nSessions to process:")
-            print("-" * 80)
+            # Collect the report and emit it in a single write
+            out = ["", "Sessions to process:", "-" * 80]
             
-            session_list = list(sessions.values())[:10]  # Show first 10 sessions
-            for session in session_list:
+            for session in islice(sessions.values(), 10):  # Show first 10 sessions
                 meta = session.metadata
-                print(f"📁 {session.session_key}")
-                print(f"   Ministry: {meta.ministry or 'Unknown'}")
-                print(f"   Meeting: {meta.meeting_name or 'Unknown'}")
+                out.append(f"📁 {session.session_key}")
+                out.append(f"   Ministry: {meta.ministry or 'Unknown'}")
+                out.append(f"   Meeting: {meta.meeting_name or 'Unknown'}")
                 if meta.round_num:
-                    print(f"   Round: {meta.round_num}")
+                    out.append(f"   Round: {meta.round_num}")
                 if meta.date:
-                    print(f"   Date: {meta.get_formatted_date()}")
-                print(f"   PDFs: {len(session.pdfs)} files")
-                print()
+                    out.append(f"   Date: {meta.formatted_date}")
+                out.append(f"   PDFs: {len(session.pdfs)} files")
+                out.append("")
             
             if len(sessions) > 10:
-                print(f"... and {len(sessions) - 10} more sessions")
+                out.append(f"... and {len(sessions) - 10} more sessions")
             
-            print("\nStatistics:")
-            print("-" * 40)
-            print(f"Total sessions: {self.stats['total_sessions']}")
-            print(f"Total PDFs: {self.stats['total_pdfs']}")
+            out += ["", "Statistics:", "-" * 40]
+            out.append(f"Total sessions: {self.stats['total_sessions']}")
+            out.append(f"Total PDFs: {self.stats['total_pdfs']}")
             for ministry, count in self.stats['by_ministry'].items():
-                print(f"{ministry}: {count} sessions")
+                out.append(f"{ministry}: {count} sessions")
+            sys.stdout.write('\n'.join(out) + '\n')
             
             return True
         return False
     
     def generate_session_markdown(self, session: SessionGroup, all_summaries: List[Dict]) -> str:
         """Generate markdown content for a session with all its PDFs."""
-        lines = []
-        
         meta = session.metadata
-        
-        # デジタル庁形式のフロントマター
-        lines.append("---")
-        
-        # date (クォート付き)
-        if meta.date:
-            lines.append(f"date: '{meta.get_formatted_date()}'")
-        
-        # meeting (title から変更)
-        if meta.meeting_name:
-            lines.append(f"meeting: {meta.meeting_name}")
-        
-        # round (数値のまま)
-        if meta.round_num:
-            round_val = int(meta.round_num) if meta.round_num.isdigit() else meta.round_num
-            lines.append(f"round: {round_val}")
-        
-        # source_pdf (最初のPDFファイル)
-        if session.pdfs:
-            lines.append(f"source_pdf: {session.pdfs[0].path.name}")
-        
-        # status
-        lines.append("status: completed")
-        
-        # tags (配列形式)
-        tags = []
-        if meta.ministry:
-            tags.append(meta.ministry)
-        if meta.meeting_name:
-            # 会議名から適切なタグを生成
-            simple_name = meta.meeting_name.split('_')[0] if '_' in meta.meeting_name else meta.meeting_name
-            if simple_name != meta.ministry:
-                tags.append(simple_name)
-        
-        if tags:
-            lines.append("tags:")
-            for tag in tags:
-                lines.append(f"- {tag}")
-        
-        lines.append("---")
-        lines.append("")
-        
-        # Title
-        title_parts = []
-        if meta.meeting_name:
-            title_parts.append(meta.meeting_name)
-        if meta.round_num:
-            title_parts.append(f"第{meta.round_num}回")
-        if meta.date:
-            title_parts.append(meta.get_formatted_date())
-        elif meta.fiscal_year:
-            title_parts.append(f"{meta.fiscal_year}年度")
-        
-        lines.append(f"# {' - '.join(title_parts)}")
-        lines.append("")
-        
-        # Basic information
-        lines.append("## 📋 基本情報")
-        lines.append("")
-        lines.append(f"- **省庁**: {meta.ministry or 'Unknown'}")
-        lines.append(f"- **会議名**: {meta.meeting_name or 'Unknown'}")
-        if meta.round_num:
-            lines.append(f"- **回次**: 第{meta.round_num}回")
-        if meta.date:
-            lines.append(f"- **開催日**: {meta.get_formatted_date()}")
-        lines.append(f"- **資料ファイル数**: {len(session.pdfs)}")
-        lines.append("")
-        
-        # Files list
-        lines.append("## 📄 資料一覧")
-        lines.append("")
-        for i, pdf_wrapper in enumerate(session.pdfs, 1):
-            lines.append(f"{i}. {pdf_wrapper.path.name}")
-        lines.append("")
-        
-        # Combined summary from all documents
-        lines.append("## 📝 統合要約")
-        lines.append("")
-        
-        if all_summaries:
-            # Create a combined summary from all individual summaries
-            combined_text = "\n\n---\n\n".join([
-                str(summary.get('summary', str(summary)) if isinstance(summary, dict) else str(summary))
-                for summary in all_summaries
-            ])
-            lines.append(combined_text)
-        else:
-            lines.append("要約の生成に失敗しました。")
-        lines.append("")
-        
-        # Document details
-        lines.append("## 📑 資料詳細")
-        lines.append("")
-        
-        for i, (pdf_wrapper, summary) in enumerate(zip(session.pdfs, all_summaries), 1):
-            lines.append(f"### {i}. {pdf_wrapper.path.name}")
-            lines.append("")
-            
-            if isinstance(summary, dict):
-                if 'summary' in summary:
-                    lines.append(summary['summary'])
-                else:
-                    lines.append(str(summary))
-            else:
-                lines.append(str(summary))
-            lines.append("")
-        
-        # Links section
-        lines.append("## 🔗 関連リンク")
-        lines.append("")
-        lines.append(f"- [[{meta.ministry or 'Unknown'}]]")
-        if meta.meeting_name:
-            lines.append(f"- [[{meta.meeting_name}]]")
-        lines.append("")
-        
-        return '\n'.join(lines)
+        # The note depends only on these metadata fields, PDF names and summary texts.
+        # The date is read once, pre-formatted; a date that does not parse is left out of the note
+        meta_key = (meta.meeting_name, meta.round_num, meta.formatted_date, meta.ministry, meta.fiscal_year)
+        summary_texts = tuple(map(_summary_text, all_summaries))
+        return _render_session_markdown(meta_key, tuple(pdf_wrapper.path.name for pdf_wrapper in session.pdfs),
+                                        summary_texts)
     
     def process_session(self, session: SessionGroup) -> bool:
         """Process a complete session (all PDFs in the session folder)."""
         try:
             session_name = session.get_session_name()
-            logger.info(f"Processing session: {session_name} ({len(session.pdfs)} PDFs)")
+            pdfs = session.pdfs
+            logger.info("Processing session: %s (%d PDFs)", session_name, len(pdfs))
             
-            all_summaries = []
+            # One slot per PDF: a finished summary string, or (summary future, index into a
+            # batched result or None, excerpt)
+            slots = []
+            append_slot = slots.append
+            summarizer = self.text_summarizer
+            summarize = functools.partial(summarizer.power_summary, nocache=self.args.nocache)
+            submit_summary = self._summary_pool.submit
+            processed_pdfs = 0
+            # Short texts are held back and summarized several per request below
+            small_texts = []
+            
+            # Extraction is already queued by run(); each PDF's summary is started as
+            # soon as its text arrives, so a session's PDFs are summarized concurrently
+            text_futures = self._take_extraction(session)
             
             # Process each PDF in the session
-            for pdf_wrapper in session.pdfs:
+            for pdf_wrapper in pdfs:
+                name = pdf_wrapper.path.name
+                # Drop each future once read, so a text is freed as soon as its summary is done
+                text_future = text_futures.pop(0)
                 try:
                     # Extract text
-                    text = self.pdf_processor.extract(pdf_wrapper.path)
-                    if not text.strip():
-                        logger.warning(f"Empty PDF: {pdf_wrapper.path.name}")
-                        all_summaries.append("このファイルは空です。")
+                    text = text_future.result()
+                    if not text or text.isspace():
+                        logger.warning("Empty PDF: %s", name)
+                        append_slot("このファイルは空です。")
                         continue
                     
-                    logger.info(f"  - Processing {pdf_wrapper.path.name} ({len(text)} chars)")
+                    logger.info("  - Processing %s (%d chars)", name, len(text))
                     
                     # Generate summary for this PDF
-                    try:
-                        summary = self.text_summarizer.power_summary(text, nocache=self.args.nocache)
-                        all_summaries.append(summary)
-                    except Exception as e:
-                        logger.error(f"Failed to generate summary for {pdf_wrapper.path.name}: {e}")
-                        fallback_summary = f"エラー: 要約の生成に失敗しました。\n\n原文の最初の500文字:\n{text[:500]}..."
-                        all_summaries.append(fallback_summary)
-                    
-                    self.stats['processed_pdfs'] += 1
+                    # Only the fallback's excerpt outlives the summary task
+                    if summarizer.is_batchable(text):
+                        small_texts.append((len(slots), text))
+                        append_slot(None)
+                    else:
+                        append_slot((submit_summary(summarize, text), None, text[:500]))
+                    processed_pdfs += 1
                     
                 except Exception as e:
-                    logger.error(f"Failed to process PDF {pdf_wrapper.path.name}: {e}")
-                    all_summaries.append(f"エラー: {pdf_wrapper.path.name}の処理に失敗しました。")
-            
-            # Create output directory structure
-            meta = session.metadata
-            if meta.ministry:
-                out_dir = VAULT_ROOT / meta.ministry
-            else:
-                out_dir = VAULT_ROOT / "分類不明"
+                    logger.error("Failed to process PDF %s: %s", name, e)
+                    append_slot(f"エラー: {name}の処理に失敗しました。")
             
-            out_dir.mkdir(parents=True, exist_ok=True)
+            for batch in summarizer.pack_batches(small_texts):
+                if len(batch) == 1:
+                    slot_index, text = batch[0]
+                    slots[slot_index] = (submit_summary(summarize, text), None, text[:500])
+                    continue
+                batch_future = submit_summary(summarizer.batch_summary, [text for _, text in batch],
+                                              self.args.nocache)
+                for position, (slot_index, text) in enumerate(batch):
+                    slots[slot_index] = (batch_future, position, text[:500])
+            del small_texts
             
-            # Generate markdown content for the entire session
-            markdown_content = self.generate_session_markdown(session, all_summaries)
-            
-            # Generate output filename
-            output_filename = f"{session_name}.md"
-            output_file = out_dir / output_filename
+            # Collect summaries in PDF order
+            all_summaries = []
+            for pdf_wrapper, slot in zip(pdfs, slots):
+                if isinstance(slot, str):
+                    all_summaries.append(slot)
+                    continue
+                summary_future, position, excerpt = slot
+                try:
+                    result = summary_future.result()
+                    all_summaries.append(result if position is None else result[position])
+                except Exception as e:
+                    logger.error("Failed to generate summary for %s: %s", pdf_wrapper.path.name, e)
+                    fallback_summary = f"エラー: 要約の生成に失敗しました。\n\n原文の最初の500文字:\n{excerpt}..."
+                    all_summaries.append(fallback_summary)
             
-            # Handle duplicate filenames
-            if output_file.exists() and not self.args.overwrite:
-                base_name = output_file.stem
-                counter = 1
-                while output_file.exists():
-                    output_file = out_dir / f"{base_name}_{counter}.md"
-                    counter += 1
+            # Output directory (created on first use by _reserve_output_file)
+            out_dir = self._ministry_dir(session.metadata.ministry or "分類不明")
             
-            # Write markdown file
-            output_file.write_text(markdown_content, encoding='utf-8')
-            logger.info(f"Created: {output_file.relative_to(VAULT_ROOT)}")
+            # Generate markdown content for the entire session (encoded outside the lock)
+            markdown_bytes = self.generate_session_markdown(session, all_summaries).encode('utf-8')
             
-            # Mark session as processed
-            self.processed_db.mark_with_metadata(session.session_key, 'success', meta)
-            self.stats['processed_sessions'] += 1
+            # Write markdown file (the name is reserved, so no lock is held while writing)
+            output_file = self._write_output_file(out_dir, session_name, markdown_bytes)
+            with self._lock:
+                self.stats['processed_pdfs'] += processed_pdfs
+            logger.info("Created: %s", output_file.relative_to(self.vault_root))
             return True
             
         except Exception as e:
-            logger.error(f"Failed to process session {session.session_key}: {e}", exc_info=True)
+            logger.error("Failed to process session %s: %s", session.session_key, e, exc_info=True)
+            return False
+    
+    def _submit_extraction(self, session: SessionGroup) -> List[Future]:
+        """Return the extraction futures for a session's PDFs, submitting them on first use."""
+        with self._lock:
+            futures = self._text_futures.get(session.session_key)
+            if futures is None:
+                futures = self._text_futures[session.session_key] = [
+                    self._extract_pool.submit(self._extract_text, pdf_wrapper.path)
+                    for pdf_wrapper in session.pdfs
+                ]
+        return futures
+    
+    def _take_extraction(self, session: SessionGroup) -> List[Future]:
+        """Hand a session's extraction futures to its worker, which then owns the texts."""
+        futures = self._submit_extraction(session)
+        with self._lock:
+            self._text_futures.pop(session.session_key, None)
+        return futures
+    
+    def _ministry_dir(self, ministry: str) -> Path:
+        """Output directory for a ministry; the Path (and its cached str/hash) is shared across sessions."""
+        out_dir = self._ministry_dirs.get(ministry)
+        if out_dir is None:
+            out_dir = self._ministry_dirs.setdefault(ministry, self.vault_root / ministry)
+        return out_dir
+    
+    def _reserve_output_file(self, out_dir: Path, base_name: str) -> Path:
+        """Pick the output path for a session, appending _N on duplicate names unless overwriting."""
+        with self._lock:
+            names = self._dir_names.get(out_dir)
+            if names is None:
+                out_dir.mkdir(parents=True, exist_ok=True)
+                with os.scandir(out_dir) as it:
+                    names = self._dir_names[out_dir] = {entry.name for entry in it}
+            
+            filename = f"{base_name}.md"
+            if filename in names and not self.args.overwrite:
+                # Resume from the last suffix handed out for this name instead of probing from _1
+                counter = self._next_suffix.get((out_dir, base_name), 1)
+                while f"{base_name}_{counter}.md" in names:
+                    counter += 1
+                filename = f"{base_name}_{counter}.md"
+                self._next_suffix[(out_dir, base_name)] = counter + 1
+            names.add(filename)
+        return out_dir / filename
+    
+    def _write_output_file(self, out_dir: Path, base_name: str, data: bytes) -> Path:
+        """Write a session note under a freshly reserved name and return its path."""
+        while True:
+            output_file = self._reserve_output_file(out_dir, base_name)
+            try:
+                if self.args.overwrite:
+                    output_file.write_bytes(data)
+                    return output_file
+                # O_EXCL claims the name atomically, so a file created since the directory
+                # scan (e.g. by another run) is never clobbered; it just takes the next suffix
+                try:
+                    fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+                except FileExistsError:
+                    continue
+                try:
+                    with open(fd, 'wb') as f:
+                        f.write(data)
+                except BaseException:
+                    output_file.unlink(missing_ok=True)  # Never leave a truncated note behind
+                    raise
+                return output_file
+            except BaseException:
+                # The index is built from _dir_names, so it must not list a note that was never written
+                if not output_file.exists():
+                    with self._lock:
+                        self._dir_names[out_dir].discard(output_file.name)
+                raise
+    
+    def _record_session_result(self, session: SessionGroup, success: bool):
+        """Mark a finished session in the processed DB (called from the main thread only)."""
+        if success:
+            self.processed_db.mark_with_metadata(session.session_key, 'success', session.metadata)
+            self.stats['processed_sessions'] += 1
+        else:
             self.processed_db.mark_with_metadata(session.session_key, 'error', session.metadata)
             self.stats['errors'] += 1
-            return False
     
     def create_index_files(self):
         """Create index files for the vault."""
@@ -518,35 +709,44 @@ class SessionBasedGovMeetTracker:
             index_content.append(f"- セッション数: {count}")
             index_content.append("")
         
-        index_file = VAULT_ROOT / "index.md"
-        index_file.write_text('\n'.join(index_content), encoding='utf-8')
-        
-        # Create ministry index files
-        for ministry_dir in VAULT_ROOT.iterdir():
-            if ministry_dir.is_dir() and not ministry_dir.name.startswith('.'):
-                self._create_ministry_index(ministry_dir)
+        # Ministry indexes are independent, so they are listed and written concurrently,
+        # overlapping the main index write
+        with os.scandir(self.vault_root) as it:
+            ministry_dirs = [Path(entry.path) for entry in it
+                             if entry.is_dir() and not entry.name.startswith('.')]
+        with ThreadPoolExecutor(max_workers=INDEX_WORKERS, thread_name_prefix='index') as pool:
+            writes = [pool.submit(self._create_ministry_index, ministry_dir) for ministry_dir in ministry_dirs]
+            index_file = self.vault_root / "index.md"
+            index_file.write_bytes('\n'.join(index_content).encode('utf-8'))
+            for future in writes:
+                future.result()
     
     def _create_ministry_index(self, ministry_dir: Path):
         """Create index file for a ministry."""
         ministry_name = ministry_dir.name
-        md_files = list(ministry_dir.glob('*.md'))
+        # Directories written this run are already indexed by name; others need one scandir
+        names = self._dir_names.get(ministry_dir)
+        if names is None:
+            # Name test first: DirEntry.is_file() only matters (and may stat) for *.md entries
+            with os.scandir(ministry_dir) as it:
+                md_names = [entry.name for entry in it if entry.name.endswith('.md') and entry.is_file()]
+        else:
+            md_names = [name for name in names if name.endswith('.md')]
+        md_names.sort()
         
         # Create index content
         index_content = [
             f"# {ministry_name}",
             "",
-            f"会議セッション数: {len(md_files)}",
+            f"会議セッション数: {len(md_names)}",
             "",
             "## 会議セッション一覧",
             ""
         ]
-        
-        for md_file in sorted(md_files):
-            session_name = md_file.stem
-            index_content.append(f"- [[{session_name}]]")
+        index_content.extend(f"- [[{name[:-3]}]]" for name in md_names)
         
         index_file = ministry_dir / "index.md"
-        index_file.write_text('\n'.join(index_content), encoding='utf-8')
+        index_file.write_bytes('\n'.join(index_content).encode('utf-8'))
     
     def run(self):
         """Main execution method."""
@@ -566,25 +766,85 @@ class SessionBasedGovMeetTracker:
         if self.dry_run(sessions):
             return
         
-        # Main processing loop
-        bar = tqdm(total=len(sessions), desc='Processing Sessions')
-        
-        for session_key, session in sessions.items():
-            # Skip if already processed (unless overwrite)
-            if not self.args.overwrite and self.processed_db.is_processed(session_key):
-                self.stats['skipped_sessions'] += 1
-                bar.update(1)
-                continue
-            
-            # Log progress every 5 sessions
-            if self.stats['processed_sessions'] > 0 and self.stats['processed_sessions'] % 5 == 0:
-                self.monitor.log_status(self.rate_limiter)
-            
-            # Process the session
-            self.process_session(session)
-            bar.update(1)
-        
-        bar.close()
+        # Skip already processed sessions (unless overwrite), using one snapshot of processed keys
+        if self.args.overwrite:
+            to_process = list(sessions.values())
+        else:
+            processed = self.processed_db.snapshot_processed()
+            to_process = [session for session_key, session in sessions.items() if session_key not in processed]
+        self.stats['skipped_sessions'] = len(sessions) - len(to_process)
+        
+        # Longest-processing-time first: start the biggest sessions early so they don't finish last
+        to_process.sort(key=SessionGroup.total_size, reverse=True)
+        
+        # Main processing loop; the bar covers only the work left, so its rate and ETA are real
+        # Throttle redraws: at most every 0.5s / ~200 redraws per run
+        bar = tqdm(total=len(to_process), desc='Processing Sessions',
+                   mininterval=0.5, miniters=max(1, len(to_process) // 200))
+        if self.stats['skipped_sessions']:
+            logger.info(f"Skipping {self.stats['skipped_sessions']} already processed sessions")
+        
+        # Two-stage pipeline: --workers processes extract text, --api-workers threads run
+        # sessions and as many more run per-PDF summaries, throttled by the shared rate limiter.
+        # Results are recorded here, on completion, so the processed DB has a single writer.
+        workers = max(1, min(self.args.workers, WORKER_CAP))
+        # More sessions than the limiter admits would only park threads (each with its own
+        # chunk pool) on wait_for_capacity, so default to the limiter's concurrency cap
+        api_workers = self.args.api_workers or self.rate_limiter.max_concurrent
+        logger.info(f"Pipeline: {workers} extraction processes, {api_workers} session workers")
+        from processing.pdf_processor import extract_text, init_worker
+        # Extracted text is cached per unchanged PDF; --nocache re-parses every file
+        text_cache = None if self.args.nocache else CACHE_DIR / 'text'
+        self._extract_text = functools.partial(extract_text, cache_dir=text_cache)
+        self.text_summarizer  # Build API components before worker threads share them
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_extract_mp_context(),
+                                     initializer=init_worker, initargs=(LOG_FORMAT,)) as extract_pool, \
+                    ThreadPoolExecutor(max_workers=max(1, api_workers)) as executor, \
+                    ThreadPoolExecutor(max_workers=max(1, api_workers), thread_name_prefix='summary') as summary_pool:
+                self._extract_pool = extract_pool
+                self._summary_pool = summary_pool
+                # Sessions are handed to the workers in a bounded window, `workers` ahead of the
+                # running ones: each one's extraction is queued here, once, before its worker takes
+                # it, so the processes never idle while sessions wait on the API and only the
+                # window's texts are held in memory
+                window = api_workers + workers
+                upcoming = iter(to_process)
+                futures = {}
+                last_log = time.monotonic()
+                try:
+                    while True:
+                        for session in islice(upcoming, window - len(futures)):
+                            self._submit_extraction(session)
+                            futures[executor.submit(self.process_session, session)] = session
+                        if not futures:
+                            break
+                        # Drain every session that has finished, then update the bar once per batch
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._record_session_result(futures.pop(future), future.result())
+                        bar.update(len(done))
+                        
+                        # Log progress at most every STATUS_LOG_INTERVAL seconds
+                        now = time.monotonic()
+                        if now - last_log >= STATUS_LOG_INTERVAL:
+                            self.monitor.log_status(self.rate_limiter)
+                            last_log = now
+                except KeyboardInterrupt:
+                    # Drop the queued sessions and their extraction; running ones finish first
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    for future, session in futures.items():
+                        if future.cancelled():
+                            for text_future in self._take_extraction(session):
+                                text_future.cancel()
+                    executor.shutdown(wait=True)
+                    for future, session in futures.items():
+                        if not future.cancelled():
+                            self._record_session_result(session, future.result())
+                    raise
+        finally:
+            bar.close()
+            self.processed_db.compact()
         
         # Create index files
         self.create_index_files()
@@ -601,10 +861,8 @@ class SessionBasedGovMeetTracker:
         logger.info("=" * 60)
         
         # Save final statistics
-        stats_file = VAULT_ROOT / 'processing_stats.json'
-        stats_file.write_text(
-            json.dumps(self.stats, ensure_ascii=False, indent=2)
-        )
+        stats_file = self.vault_root / 'processing_stats.json'
+        stats_file.write_bytes(dump_json(self.stats))
         
         # --- Master Vault Sync ---
         try:
@@ -612,7 +870,7 @@ class SessionBasedGovMeetTracker:
             master_dir = BASE_VAULT_ROOT / "master_vault"
             logger.info(f"Syncing to master vault: {master_dir}")
             syncer = VaultSynchronizer(master_dir)
-            syncer.sync(VAULT_ROOT)
+            syncer.sync(self.vault_root)
         except Exception as e:
             logger.warning(f"Failed to sync to master vault: {e}")
 
@@ -636,7 +894,12 @@ def create_argument_parser():
                        help='Remove cache files older than N days')
     
     # Performance options
-    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Number of workers')
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS, help='Number of PDF extraction processes')
+    parser.add_argument('--api-workers', type=int, default=API_WORKERS,
+                       help='Number of concurrent sessions in the summarization (API) stage '
+                            '(default: the rate limiter\'s max concurrency)')
+    parser.add_argument('--http2', action='store_true',
+                       help='Use HTTP/2 for API requests (requires the h2 package)')
     parser.add_argument('--aggressive', action='store_true', 
                        help='最大並列度で処理（レート制限ギリギリ）')
     parser.add_argument('--rate-limit-rpm', type=int, default=5000, 
@@ -651,6 +914,7 @@ def main():
     parser = create_argument_parser()
     args = parser.parse_args()
     
+    log_listener = _start_logging()
     try:
         app = SessionBasedGovMeetTracker(args)
         app.run()
@@ -660,6 +924,9 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        # Flush queued records before exiting
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,17 +4,26 @@ DB4DD - Text Cache Based Processing Module
 Processes cached text files instead of PDFs to generate AI-powered summaries.
 Uses existing text files in text_cache/ directory for more efficient processing.
 """
+import io
 import os
+import codecs
+import hashlib
 import sys
 import argparse
 import logging
+import re
+import mmap
+import functools
+import queue
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 from tqdm import tqdm
 from datetime import datetime
 import json
 from collections import defaultdict
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple, Union
 
 # Load environment variables
 load_dotenv(Path(__file__).parent / '.env')
@@ -22,6 +31,18 @@ load_dotenv(Path(__file__).parent / '.env')
 # Add the src directory to the path
 sys.path.insert(0, str(Path(__file__).parent))
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Import our modules
 from core.rate_limiter import AdaptiveRateLimiter, RequestMonitor
 from core.api_client import APIClient
@@ -50,7 +71,31 @@ TEXT_CACHE_ROOT = DATA_ROOT / 'text_cache'
 BASE_VAULT_ROOT = Path(os.getenv('VAULT_ROOT', REPO_ROOT / 'vaults'))
 CACHE_DIR = Path(os.getenv('CACHE_DIR', REPO_ROOT / 'vaults/.cache'))
 CHUNK_SIZE = int(os.getenv('CHUNK_CHARS', '2000'))
+# Sessions processed concurrently (mostly waiting on the API, so threads suffice)
 MAX_WORKERS = int(os.getenv('MAX_WORKERS', '4'))
+# Text files at least this large are decoded straight from a read-only mapping
+MMAP_MIN_BYTES = 1024 * 1024
+# Bytes decoded per step when streaming a mapped file into the combined text
+DECODE_CHUNK_BYTES = 64 * 1024
+# Written after each file's content in a session's combined text
+_FILE_SEPARATOR = "\n\n" + "=" * 50 + "\n"
+
+# Lines containing any of these terms become key points in Turbo Mode summaries
+IMPORTANT_TERMS = ('議論', '決定', '審議', '検討', '提案', '課題', '方針', '確認')
+# All terms matched in one pass per line: an Aho-Corasick automaton, else a regex alternation
+if AHOCORASICK_AVAILABLE:
+    _TERM_AUTOMATON = ahocorasick.Automaton()
+    for _term in IMPORTANT_TERMS:
+        _TERM_AUTOMATON.add_word(_term, _term)
+    _TERM_AUTOMATON.make_automaton()
+else:
+    _TERM_PATTERN = re.compile('|'.join(map(re.escape, IMPORTANT_TERMS)))
+
+def _has_important_term(line: str) -> bool:
+    """True if the line contains any of IMPORTANT_TERMS."""
+    if AHOCORASICK_AVAILABLE:
+        return next(_TERM_AUTOMATON.iter(line), None) is not None
+    return _TERM_PATTERN.search(line) is not None
 
 # Generate date-based vault directory
 def get_default_vault_root():
@@ -64,12 +109,101 @@ def get_default_vault_root():
 
 VAULT_ROOT = get_default_vault_root()
 
+def _head_lines(text: str, limit: int):
+    """Yield the first limit items of text.split('\n') without splitting the rest of the text."""
+    start = 0
+    for _ in range(limit):
+        end = text.find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+def _copy_text_file(text_file: Path, out: io.StringIO, seen: set) -> bool:
+    """Decode a UTF-8 text file into out; return False if it held only whitespace.
+    
+    Small files take one binary read. Large ones are mapped and decoded incrementally, so
+    neither a bytes copy nor a whole-file str of a multi-MB transcript is ever materialized.
+    Files whose content digest is already in seen are not decoded at all (return False);
+    the digest of every file written is added to seen.
+    """
+    with open(text_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+            data = f.read()
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if digest in seen:
+                logger.info(f"Skipping duplicate of an earlier file: {text_file.name}")
+                return False
+            content = data.decode('utf-8')
+            out.write(content)
+            seen.add(digest)
+            return bool(content) and not content.isspace()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            digest = hashlib.blake2b(view, digest_size=16).digest()
+            if digest in seen:
+                logger.info(f"Skipping duplicate of an earlier file: {text_file.name}")
+                return False
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            blank = True
+            for start in range(0, len(view), DECODE_CHUNK_BYTES):
+                text = decoder.decode(view[start:start + DECODE_CHUNK_BYTES])
+                blank = blank and (not text or text.isspace())
+                out.write(text)
+            text = decoder.decode(b'', final=True)
+            out.write(text)
+            seen.add(digest)
+            return not (blank and (not text or text.isspace()))
+
+# Canonical stem {meeting}_第{N}回_{YYYYMMDD}[_{suffix}], matched in one scan
+_CANONICAL_STEM = re.compile(r'([^_]*)_第(\d+)回_(\d{4})(\d{2})(\d{2})(?:_|$)')
+
+@functools.lru_cache(maxsize=4096)
+def _parse_filename_stem(stem: str) -> Optional[Tuple[Optional[str], Optional[int], Optional[str]]]:
+    """Parse (meeting_name, round_num, date) from a text file stem, or None if it has too few parts."""
+    # Example: EBPM研究会_第01回_20230621_議事次第
+    m = _CANONICAL_STEM.match(stem)
+    if m:
+        meeting_name, round_str, year, month, day = m.groups()
+        return meeting_name, int(round_str), f"{int(year)}-{int(month):02d}-{int(day):02d}"
+    
+    # Other layouts: parse part by part
+    parts = stem.split('_')
+    if len(parts) < 3:
+        return None
+    
+    meeting_name = parts[0]
+    round_num = None
+    date = None
+    
+    # Extract round number
+    if '第' in parts[1] and '回' in parts[1]:
+        round_str = parts[1].replace('第', '').replace('回', '')
+        try:
+            round_num = int(round_str)
+        except:
+            pass
+    
+    # Extract date
+    if len(parts[2]) == 8 and parts[2].isdigit():
+        try:
+            year = int(parts[2][:4])
+            month = int(parts[2][4:6])
+            day = int(parts[2][6:8])
+            date = f"{year}-{month:02d}-{day:02d}"
+        except:
+            pass
+    
+    return meeting_name, round_num, date
+
 class TextCacheSession:
     """Represents a group of text files from the same meeting session."""
     def __init__(self, session_key: str, session_dir: Path):
         self.session_key = session_key
         self.session_dir = session_dir
-        self.text_files: List[Path] = []
+        self.text_files: List[Path] = []  # Sorted by the caller once discovery is complete
         self.metadata: Optional[FileMetadata] = None
         self.meeting_name = None
         self.round_num = None
@@ -85,30 +219,10 @@ class TextCacheSession:
     
     def _parse_metadata_from_filename(self, text_file: Path):
         """Parse metadata from text filename."""
-        # Example: EBPM研究会_第01回_20230621_議事次第.txt
-        filename = text_file.stem  # Remove .txt extension
-        parts = filename.split('_')
+        parsed = _parse_filename_stem(text_file.stem)  # Stem: filename without .txt
         
-        if len(parts) >= 3:
-            self.meeting_name = parts[0]
-            
-            # Extract round number
-            if '第' in parts[1] and '回' in parts[1]:
-                round_str = parts[1].replace('第', '').replace('回', '')
-                try:
-                    self.round_num = int(round_str)
-                except:
-                    pass
-            
-            # Extract date
-            if len(parts[2]) == 8 and parts[2].isdigit():
-                try:
-                    year = int(parts[2][:4])
-                    month = int(parts[2][4:6])
-                    day = int(parts[2][6:8])
-                    self.date = f"{year}-{month:02d}-{day:02d}"
-                except:
-                    pass
+        if parsed is not None:
+            self.meeting_name, self.round_num, self.date = parsed
             
             # Create metadata object
             self.metadata = FileMetadata()
@@ -130,22 +244,31 @@ class TextCacheSession:
     
     def get_combined_text(self) -> str:
         """Read and combine all text files in this session."""
-        combined_text = []
+        # Built in one buffer rather than a list of parts joined at the end
+        buf = io.StringIO()
+        # Content digests of files already included: sessions often carry the same
+        # attachment under two names, which would otherwise be sent to the API twice
+        seen = set()
         
-        for text_file in sorted(self.text_files):
+        for text_file in self.text_files:
+            # Each file is decoded straight into the buffer after its header; a blank or
+            # unreadable file is rolled back to here
+            start = buf.tell()
             try:
-                with open(text_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if content.strip():  # Only add non-empty content
-                        # Add a header for each file
-                        file_type = text_file.stem.split('_')[-1]  # e.g., 議事次第, 資料1
-                        combined_text.append(f"\n=== {file_type} ===\n")
-                        combined_text.append(content)
-                        combined_text.append("\n" + "="*50 + "\n")
+                if start:
+                    buf.write("\n")
+                # Add a header for each file
+                file_type = text_file.stem.split('_')[-1]  # e.g., 議事次第, 資料1
+                buf.write(f"\n=== {file_type} ===\n\n")
+                if _copy_text_file(text_file, buf, seen):  # Only add non-empty, unseen content
+                    buf.write(_FILE_SEPARATOR)
+                    continue
             except Exception as e:
                 logger.warning(f"Failed to read {text_file}: {e}")
+            buf.seek(start)
+            buf.truncate()
         
-        return "\n".join(combined_text)
+        return buf.getvalue()
 
 class TextCacheProcessor:
     """Process cached text files to generate summaries."""
@@ -168,12 +291,25 @@ class TextCacheProcessor:
         # Smart skip configuration
         self.max_size_bytes = args.max_size_kb * 1024 if args.max_size_kb else None
         self.skipped_log = Path('skipped_huge_sessions.log')
+        
+        # Output directory per ministry, created on first use and reused by later sessions
+        self._ministry_dirs: Dict[str, Path] = {}
 
         if self.args.turbo:
             logger.info("🚀 TURBO MODE ENABLED: Using heuristic summary generation (No AI)")
         if self.max_size_bytes:
             logger.info(f"🛡️  SMART MODE ENABLED: Skipping sessions larger than {args.max_size_kb}KB")
     
+    def _get_ministry_dir(self, ministry: str) -> Path:
+        """Output directory for a ministry, created (one mkdir) the first time it is needed."""
+        output_dir = self._ministry_dirs.get(ministry)
+        if output_dir is None:
+            output_dir = VAULT_ROOT / ministry
+            output_dir.mkdir(parents=True, exist_ok=True)
+            # Sessions run concurrently; a racing thread's mkdir is harmless (exist_ok)
+            output_dir = self._ministry_dirs.setdefault(ministry, output_dir)
+        return output_dir
+    
     def find_text_sessions(self) -> Dict[str, TextCacheSession]:
         """Find and group text files by session."""
         sessions = {}
@@ -183,8 +319,11 @@ class TextCacheProcessor:
             ministries = [self.args.ministry]
         else:
             # Process all available ministries
-            ministries = [d.name for d in TEXT_CACHE_ROOT.iterdir() if d.is_dir()]
+            with os.scandir(TEXT_CACHE_ROOT) as it:
+                ministries = [entry.name for entry in it if entry.is_dir()]
         
+        # os.scandir throughout: DirEntry.is_dir()/is_file() use the type from the directory
+        # listing, so discovery does not stat every entry
         for ministry in ministries:
             ministry_path = TEXT_CACHE_ROOT / ministry
             if not ministry_path.exists():
@@ -192,21 +331,19 @@ class TextCacheProcessor:
                 continue
             
             # Find all meeting directories
-            for meeting_dir in ministry_path.iterdir():
-                if not meeting_dir.is_dir():
-                    continue
-                
+            with os.scandir(ministry_path) as it:
+                meeting_entries = [entry for entry in it if entry.is_dir()]
+            for meeting_entry in meeting_entries:
                 # Skip if specific meeting filter is set
-                if self.args.meeting and self.args.meeting not in str(meeting_dir):
+                if self.args.meeting and self.args.meeting not in meeting_entry.path:
                     continue
                 
                 # Find all session directories
-                for session_dir in meeting_dir.iterdir():
-                    if not session_dir.is_dir():
-                        continue
-                    
+                with os.scandir(meeting_entry.path) as it:
+                    session_entries = [entry for entry in it if entry.is_dir()]
+                for session_entry in session_entries:
                     # Create session key
-                    session_key = f"{ministry}/{meeting_dir.name}/{session_dir.name}"
+                    session_key = f"{ministry}/{meeting_entry.name}/{session_entry.name}"
                     
                     # Check if already processed
                     if not self.args.overwrite and self.processed_db.is_processed(session_key):
@@ -214,13 +351,18 @@ class TextCacheProcessor:
                         continue
                     
                     # Create session group
+                    session_dir = Path(session_entry.path)
                     session = TextCacheSession(session_key, session_dir)
                     
                     # Find all text files in session directory
-                    text_files = list(session_dir.glob("*.txt"))
+                    with os.scandir(session_dir) as it:
+                        text_files = [Path(entry.path) for entry in it
+                                      if entry.name.endswith('.txt') and entry.is_file()]
                     if text_files:
                         for text_file in text_files:
                             session.add_text_file(text_file)
+                        # Sorted once here, so reading never has to re-sort
+                        session.text_files.sort()
                         sessions[session_key] = session
                         logger.info(f"Found session with {len(text_files)} text files: {session_key}")
         
@@ -228,20 +370,16 @@ class TextCacheProcessor:
 
     def generate_heuristic_summary(self, text: str, session: TextCacheSession) -> dict:
         """Generate a quick summary without AI (Turbo Mode)."""
-        lines = text.split('\n')
-        
         # Find important keywords (Basic extraction)
         keywords = []
-        important_terms = ['議論', '決定', '審議', '検討', '提案', '課題', '方針', '確認']
         
-        for line in lines[:200]:  # Check first 200 lines
-            for term in important_terms:
-                if term in line and len(line.strip()) > 10 and len(line.strip()) < 100:
-                    keywords.append(line.strip())
-                    if len(keywords) >= 8:
-                        break
-            if len(keywords) >= 8:
-                break
+        for line in _head_lines(text, 200):  # Check first 200 lines
+            stripped = line.strip()
+            # Cheap length test first; each line is then scanned once for all terms
+            if 10 < len(stripped) < 100 and _has_important_term(line):
+                keywords.append(stripped)
+                if len(keywords) >= 8:
+                    break
         
         meeting_name = session.meeting_name or "不明な会議"
         round_info = f"第{session.round_num}回" if session.round_num else ""
@@ -258,60 +396,88 @@ class TextCacheProcessor:
         }
         return summary
     
-    def process_session(self, session: TextCacheSession) -> bool:
-        """Process a single session of text files."""
-        try:
-            logger.info(f"Processing session: {session.session_key}")
+    def _prepare_session(self, session: TextCacheSession) -> Union[bool, Tuple[Path, str]]:
+        """I/O stage of a session: skip checks, then read its combined text.
+        
+        Returns the outcome for a session that ends here, else (output_path, combined_text).
+        """
+        logger.info(f"Processing session: {session.session_key}")
+        # Output directory - fix duplicate ministry in path
+        ministry = session.session_key.split('/', 1)[0]
 
-            # --- Smart Mode: Check Size ---
-            if self.max_size_bytes:
-                total_size = sum(f.stat().st_size for f in session.text_files)
-                if total_size > self.max_size_bytes:
-                    skip_msg = f"Skipped huge session: {total_size/1024:.1f}KB > {self.args.max_size_kb}KB"
-                    logger.warning(f"⚠️  {skip_msg}")
-                    
-                    # Log skip
-                    skip_info = {
-                        'timestamp': datetime.now().isoformat(),
-                        'session': session.session_key,
-                        'size_kb': total_size / 1024,
-                        'threshold_kb': self.args.max_size_kb
-                    }
-                    with open(self.skipped_log, 'a', encoding='utf-8') as f:
-                        f.write(json.dumps(skip_info, ensure_ascii=False) + '\n')
-                        
-                    # Create placeholder
-                    parts = session.session_key.split('/')
-                    ministry = parts[0]
-                    output_dir = VAULT_ROOT / ministry
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    placeholder_path = output_dir / f"{session.get_session_name()}_SKIPPED_TOO_LARGE.txt"
-                    with open(placeholder_path, 'w', encoding='utf-8') as f:
-                        f.write(f"{skip_msg}\nRun without --max-size-kb to process.\n")
+        # --- Smart Mode: Check Size ---
+        if self.max_size_bytes:
+            total_size = sum(f.stat().st_size for f in session.text_files)
+            if total_size > self.max_size_bytes:
+                skip_msg = f"Skipped huge session: {total_size/1024:.1f}KB > {self.args.max_size_kb}KB"
+                logger.warning(f"⚠️  {skip_msg}")
+                
+                # Log skip
+                skip_info = {
+                    'timestamp': datetime.now().isoformat(),
+                    'session': session.session_key,
+                    'size_kb': total_size / 1024,
+                    'threshold_kb': self.args.max_size_kb
+                }
+                if ORJSON_AVAILABLE:
+                    line = orjson.dumps(skip_info) + b'\n'
+                else:
+                    line = json.dumps(skip_info, ensure_ascii=False).encode('utf-8') + b'\n'
+                with open(self.skipped_log, 'ab') as f:
+                    f.write(line)
                     
-                    return True # Marked as processed (skipped)
-            
-            # Get combined text from all files
-            combined_text = session.get_combined_text()
-            
-            if not combined_text.strip():
-                logger.warning(f"No text content found for session: {session.session_key}")
-                return False
-            
-            # Create output path - fix duplicate ministry in path
-            parts = session.session_key.split('/')
-            ministry = parts[0]
-            
-            output_dir = VAULT_ROOT / ministry
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            output_filename = f"{session.get_session_name()}.md"
-            output_path = output_dir / output_filename
-            
-            # Skip if file exists and not overwriting
-            if output_path.exists() and not self.args.overwrite:
-                logger.info(f"Output already exists, skipping: {output_path}")
-                return True
+                # Create placeholder
+                output_dir = self._get_ministry_dir(ministry)
+                placeholder_path = output_dir / f"{session.get_session_name()}_SKIPPED_TOO_LARGE.txt"
+                placeholder_path.write_bytes(f"{skip_msg}\nRun without --max-size-kb to process.\n".encode('utf-8'))
+                
+                return True # Marked as processed (skipped)
+        
+        # Create output path
+        output_dir = self._get_ministry_dir(ministry)
+        output_filename = f"{session.get_session_name()}.md"
+        output_path = output_dir / output_filename
+        
+        # Skip if file exists and not overwriting (checked first, so the text is never read)
+        if output_path.exists() and not self.args.overwrite:
+            logger.info(f"Output already exists, skipping: {output_path}")
+            return True
+        
+        # Get combined text from all files
+        combined_text = session.get_combined_text()
+        
+        if not combined_text.strip():
+            logger.warning(f"No text content found for session: {session.session_key}")
+            return False
+        
+        return output_path, combined_text
+    
+    def _read_ahead(self, sessions, ready: queue.Queue, stop: threading.Event):
+        """Reader thread: prepare each session exactly once, in order, and queue it for run().
+        
+        A failure is queued as the exception, for process_session to report. None marks the end.
+        """
+        for session in sessions:
+            if stop.is_set():
+                return
+            try:
+                prepared = self._prepare_session(session)
+            except Exception as e:
+                prepared = e
+            ready.put((session, prepared))
+        ready.put(None)
+    
+    def process_session(self, session: TextCacheSession,
+                        prepared: Union[bool, Tuple[Path, str], Exception]) -> bool:
+        """Process a single session of text files, given its _prepare_session result."""
+        try:
+            # Files were read by the reader thread while earlier sessions waited on the API
+            if isinstance(prepared, Exception):
+                raise prepared
+            if isinstance(prepared, bool):
+                return prepared
+            output_path, combined_text = prepared
+            output_dir, output_filename = output_path.parent, output_path.name
             
             logger.info(f"Text length: {len(combined_text)} characters")
             logger.info(f"Generating AI summary...")
@@ -358,9 +524,8 @@ class TextCacheProcessor:
                 source_files
             )
             
-            # Write output
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(markdown_content)
+            # Write output (encoded once, written in one call)
+            output_path.write_bytes(markdown_content.encode('utf-8'))
             
             # Mark as processed
             self.processed_db.mark(session.session_key, 'completed')
@@ -394,25 +559,61 @@ class TextCacheProcessor:
         
         logger.info(f"Found {len(sessions)} sessions to process")
         
-        # Process each session
+        # Process sessions concurrently; results are tallied here as they complete
         success_count = 0
         fail_count = 0
         
-        with tqdm(total=len(sessions), desc="Processing sessions") as pbar:
-            for session_key, session in sessions.items():
-                try:
-                    if self.process_session(session):
-                        success_count += 1
-                    else:
-                        fail_count += 1
-                except KeyboardInterrupt:
-                    logger.info("Processing interrupted by user")
-                    break
-                except Exception as e:
-                    logger.error(f"Unexpected error processing {session_key}: {e}")
-                    fail_count += 1
-                finally:
-                    pbar.update(1)
+        workers = max(1, MAX_WORKERS)
+        # One reader thread runs the disk stage (skip checks, text reads) for each session
+        # exactly once, in order, so reads overlap API calls. The queue and the cap on
+        # submitted sessions bound how many combined texts are held in memory at once.
+        ready = queue.Queue(maxsize=workers)
+        stop = threading.Event()
+        reader = threading.Thread(target=self._read_ahead, args=(sessions.values(), ready, stop),
+                                  name='text-reader', daemon=True)
+        reader.start()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {}
+        try:
+            # disable=None turns the bar off (no formatting or clock checks) when stderr is not a TTY
+            with tqdm(total=len(sessions), desc="Processing sessions", disable=None,
+                      mininterval=1.0) as pbar:
+                reading = True
+                while reading or futures:
+                    # Keep every worker busy plus one waiting session each
+                    while reading and len(futures) < 2 * workers:
+                        item = ready.get()
+                        if item is None:
+                            reading = False
+                            break
+                        session, prepared = item
+                        futures[executor.submit(self.process_session, session, prepared)] = session.session_key
+                    if not futures:
+                        continue
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        session_key = futures.pop(future)
+                        try:
+                            if future.result():
+                                success_count += 1
+                            else:
+                                fail_count += 1
+                        except Exception as e:
+                            logger.error(f"Unexpected error processing {session_key}: {e}")
+                            fail_count += 1
+                        finally:
+                            pbar.update(1)
+        except KeyboardInterrupt:
+            logger.info("Processing interrupted by user")
+            # The reader stops after its current session (it is a daemon, so a put blocked
+            # on the full queue never holds up exit)
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            executor.shutdown()
+        finally:
+            # Marks are appended to the DB's write-ahead log; fold them into the JSON once
+            self.processed_db.compact()
         
         # Print summary
         logger.info("=" * 80)
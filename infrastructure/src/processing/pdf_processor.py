@@ -1,6 +1,9 @@
 """
 PDF text extraction with multiple fallback strategies.
 """
+import io
+import os
+import hashlib
 import tempfile
 import logging
 import subprocess
@@ -37,39 +40,49 @@ class PDFProcessor:
         
         logger.info(f"Initialized with {len(self.strategies)} extraction strategies")
     
-    def extract(self, pdf_path: Path) -> str:
-        """Extract text from PDF using fallback strategies."""
-        logger.info(f"Extracting text from {pdf_path.name}")
+    def extract(self, pdf_path: Path, data: Optional[bytes] = None) -> str:
+        """Extract text from PDF using fallback strategies.
+        
+        The file is read once and every strategy parses the in-memory bytes;
+        pass ``data`` to supply already-read contents.
+        """
+        logger.info("Extracting text from %s", pdf_path.name)
+        if data is None:
+            try:
+                data = pdf_path.read_bytes()
+            except OSError as e:
+                logger.error("Failed to read %s: %s", pdf_path.name, e)
+                return ""
         
         for i, strategy in enumerate(self.strategies):
             try:
-                text = strategy(pdf_path)
-                if text and text.strip():
-                    logger.info(f"Successfully extracted {len(text)} chars using strategy {i+1}")
+                text = strategy(data)
+                if text and not text.isspace():
+                    logger.info("Successfully extracted %d chars using strategy %d", len(text), i + 1)
                     return text
                 else:
-                    logger.warning(f"Strategy {i+1} returned empty text")
+                    logger.warning("Strategy %d returned empty text", i + 1)
             except Exception as e:
-                logger.warning(f"Strategy {i+1} failed: {e}")
+                logger.warning("Strategy %d failed: %s", i + 1, e)
                 continue
         
-        logger.error(f"All extraction strategies failed for {pdf_path.name}")
+        logger.error("All extraction strategies failed for %s", pdf_path.name)
         return ""
     
-    def _extract_with_pdfminer(self, pdf_path: Path) -> str:
+    def _extract_with_pdfminer(self, data: bytes) -> str:
         """Extract text using PDFMiner."""
-        return pdfminer.high_level.extract_text(str(pdf_path))
+        return pdfminer.high_level.extract_text(io.BytesIO(data))
     
-    def _extract_with_pymupdf(self, pdf_path: Path) -> str:
+    def _extract_with_pymupdf(self, data: bytes) -> str:
         """Extract text using PyMuPDF."""
-        doc = fitz.open(str(pdf_path))
+        doc = fitz.open(stream=data, filetype='pdf')
         text = ""
         for page in doc:
             text += page.get_text()
         doc.close()
         return text
     
-    def _extract_with_tesseract(self, pdf_path: Path) -> str:
+    def _extract_with_tesseract(self, data: bytes) -> str:
         """Extract text using Tesseract OCR."""
         try:
             import fitz  # Need PyMuPDF for image conversion
@@ -77,7 +90,7 @@ class PDFProcessor:
             logger.error("PyMuPDF required for Tesseract OCR fallback")
             return ""
         
-        doc = fitz.open(str(pdf_path))
+        doc = fitz.open(stream=data, filetype='pdf')
         text = ""
         
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -97,11 +110,64 @@ class PDFProcessor:
                     if result.returncode == 0:
                         text += result.stdout + "\n"
                     else:
-                        logger.warning(f"Tesseract failed for page {page_num}")
+                        logger.warning("Tesseract failed for page %d", page_num)
                         
                 except (subprocess.TimeoutExpired, FileNotFoundError) as e:
-                    logger.warning(f"Tesseract error on page {page_num}: {e}")
+                    logger.warning("Tesseract error on page %d: %s", page_num, e)
                     continue
         
         doc.close()
-        return text
\ No newline at end of file
+        return text
+
+# One processor per worker process, created on first use
+_worker_processor: Optional[PDFProcessor] = None
+
+def init_worker(log_format: Optional[str] = None):
+    """Process-pool initializer: build the processor (importing the PDF libraries) before the first task.
+    
+    With ``log_format``, the worker logs straight to stderr; force=True drops any handlers
+    inherited from the parent (e.g. a queue handler whose listener lives in the parent).
+    """
+    global _worker_processor
+    if log_format is not None:
+        logging.basicConfig(level=logging.INFO, format=log_format, force=True)
+    if _worker_processor is None:
+        _worker_processor = PDFProcessor()
+
+def extract_text(pdf_path: Path, cache_dir: Optional[Path] = None) -> str:
+    """Extract text with a per-process PDFProcessor (picklable entry point for process pools).
+    
+    With ``cache_dir``, text is cached by a digest of the PDF's bytes, so unchanged
+    files and identical copies under other sessions are never parsed again.
+    """
+    if cache_dir is None:
+        init_worker()
+        return _worker_processor.extract(pdf_path)
+    
+    # Read once: the same bytes are hashed and, on a miss, parsed
+    try:
+        data = pdf_path.read_bytes()
+    except OSError as e:
+        logger.error("Failed to read %s: %s", pdf_path.name, e)
+        return ""
+    cache_file = cache_dir / f"{hashlib.blake2b(data, digest_size=16).hexdigest()}.txt"
+    try:
+        return cache_file.read_bytes().decode('utf-8')
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Text cache unavailable for %s: %s", pdf_path.name, e)
+    
+    init_worker()
+    text = _worker_processor.extract(pdf_path, data)
+    
+    # Failed extractions are not cached, so they are retried on the next run
+    if text:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            tmp_file.write_bytes(text.encode('utf-8'))
+            tmp_file.replace(cache_file)
+        except OSError as e:
+            logger.warning("Failed to cache text for %s: %s", pdf_path.name, e)
+    return text
@@ -11,7 +11,8 @@ class PromptManager:
             'extract': self._extract_prompt,
             'detailed_mini': self._detailed_mini_prompt,
             'deep_analysis': self._deep_analysis_prompt,
-            'enhanced_final': self._enhanced_final_prompt
+            'enhanced_final': self._enhanced_final_prompt,
+            'batch_summary': self._batch_summary_prompt
         }
     
     def get(self, prompt_type: str, **kwargs) -> str:
@@ -67,6 +68,29 @@ sections配列で以下を明確に分けて記述：
 {full_text}
 
 JSON形式で回答してください。各セクションは具体的で詳細に記述してください。
+"""
+
+    def _batch_summary_prompt(self, documents: list) -> str:
+        numbered = "\n\n".join(f"## 文書{i}\n{doc}" for i, doc in enumerate(documents, 1))
+        return f"""
+以下の{len(documents)}件の短い会議資料を、それぞれ独立に要約してください：
+
+documents配列に、文書1から順に{len(documents)}件、各文書について以下を記述：
+- summary: 文書の2-3文での簡潔な要約
+- main_arguments: 主要な論点（3個以内）
+- discussion_flow: 内容の流れ（1段落）
+- action_items: アクションアイテム（3個以内）
+- open_issues: 未解決の課題（3個以内）
+- named_entities: 重要な人物・組織・システム名（5個以内）
+- tags: 文書を特徴づけるタグ（2-3個）
+
+重要：
+- 文書同士の内容を混ぜないでください
+- 該当がない項目は空配列[]または空文字列にしてください
+
+{numbered}
+
+JSON形式で回答してください。
 """
 
     def _enhanced_final_prompt(self, summary_text: str, extraction_text: str, full_text_sample: str) -> str:
@@ -1,16 +1,27 @@
 """
 Text summarization and analysis using OpenAI API.
 """
+import os
 import logging
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from core.api_client import APIClient
-from core.models import MeetingSummary, MiniSummary, ExtractionResult
+from core.models import MeetingSummary, MiniSummary, ExtractionResult, BatchMeetingSummary
+from core.summary_cache import SummaryCache, summary_key
 from processing.prompt_manager import PromptManager
 
 logger = logging.getLogger(__name__)
 
+# Byte budget for the persistent whole-document summary cache
+SUMMARY_CACHE_BYTES = int(os.getenv('SUMMARY_CACHE_MB', '256')) * 1024 * 1024
+
+# Short documents summarized together in one request: at most this many per request,
+# with this much completion budget each
+BATCH_MAX_DOCS = 8
+BATCH_TOKENS_PER_DOC = 800
+
 class TextSummarizer:
     """Handles text summarization with structured outputs."""
     
@@ -18,8 +29,87 @@ class TextSummarizer:
         self.api_client = api_client
         self.chunk_size = chunk_size
         self.pm = PromptManager()
+        self.summary_cache = SummaryCache(api_client.cache_dir / 'summaries.db', SUMMARY_CACHE_BYTES)
+        # Summaries being computed right now, so concurrent duplicates wait instead of re-calling the API
+        self._inflight: Dict[bytes, threading.Event] = {}
+        self._inflight_lock = threading.Lock()
+    
+    @property
+    def batch_chars(self) -> int:
+        """Character budget for the documents packed into one batched request."""
+        return self.chunk_size * 4
+    
+    def is_batchable(self, text: str) -> bool:
+        """True for documents that fit in a single chunk, so the multi-stage pipeline adds nothing."""
+        return len(text) <= self.chunk_size
+    
+    def pack_batches(self, items: List[Tuple[Any, str]]) -> List[List[Tuple[Any, str]]]:
+        """Group (key, text) pairs in order into batches within the character and size budget."""
+        batches = []
+        batch, size = [], 0
+        for item in items:
+            length = len(item[1])
+            if batch and (size + length > self.batch_chars or len(batch) >= BATCH_MAX_DOCS):
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(item)
+            size += length
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def batch_summary(self, texts: List[str], nocache: bool = False) -> List[Dict[str, Any]]:
+        """Summarize several short documents with one request; one summary per text, in order.
+        
+        Falls back to power_summary per text if the batched reply fails or does not line up.
+        """
+        try:
+            result = self.api_client.structured_chat(
+                [{'role': 'system', 'content': self.pm.get('batch_summary', documents=texts)}],
+                BatchMeetingSummary,
+                BATCH_TOKENS_PER_DOC * len(texts),
+                not nocache
+            )
+            if len(result.documents) != len(texts):
+                raise ValueError(f"expected {len(texts)} summaries, got {len(result.documents)}")
+        except Exception as e:
+            logger.warning(f"Batched summary failed, summarizing {len(texts)} documents one by one: {e}")
+            return [self.power_summary(text, nocache=nocache) for text in texts]
+        return [self._summary_dict(summary, '') for summary in result.documents]
     
     def power_summary(self, raw_text: str, nocache: bool = False) -> Dict[str, Any]:
+        """Generate comprehensive summary, reusing a cached result for identical text.
+        
+        The key ignores leading/trailing whitespace, so boilerplate documents that
+        differ only in padding share one summary.
+        """
+        key = summary_key(self.api_client.model, str(self.chunk_size), raw_text.strip())
+        if nocache:
+            summary = self._power_summary(raw_text, nocache)
+            self.summary_cache.put(key, summary)
+            return summary
+        
+        while True:
+            cached = self.summary_cache.get(key)
+            if cached is not None:
+                return cached
+            with self._inflight_lock:
+                event = self._inflight.get(key)
+                if event is None:
+                    self._inflight[key] = threading.Event()
+                    break
+            # Another thread is summarizing the same text; use its result (or retry if it failed)
+            event.wait()
+        
+        try:
+            summary = self._power_summary(raw_text, nocache)
+            self.summary_cache.put(key, summary)
+            return summary
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key).set()
+    
+    def _power_summary(self, raw_text: str, nocache: bool) -> Dict[str, Any]:
         """Generate comprehensive summary with multi-stage processing."""
         # Check if text is too large and needs special handling
         estimated_tokens = len(raw_text) / 4  # Rough estimate: 1 token ≈ 4 chars
@@ -130,16 +220,20 @@ TODO/アクション: {', '.join(all_todos)}
             not nocache
         )
         
-        # Convert to dict format
+        return self._summary_dict(final_summary, summary_text)
+    
+    @staticmethod
+    def _summary_dict(summary: MeetingSummary, outline: str) -> Dict[str, Any]:
+        """Convert a structured summary to dict format."""
         return {
-            'summary': final_summary.summary,
-            'main_arguments': final_summary.main_arguments,
-            'discussion_flow': final_summary.discussion_flow,
-            'action_items': final_summary.action_items,
-            'open_issues': final_summary.open_issues,
-            'named_entities': final_summary.named_entities,
-            'tags': final_summary.tags,
-            'outline': summary_text
+            'summary': summary.summary,
+            'main_arguments': summary.main_arguments,
+            'discussion_flow': summary.discussion_flow,
+            'action_items': summary.action_items,
+            'open_issues': summary.open_issues,
+            'named_entities': summary.named_entities,
+            'tags': summary.tags,
+            'outline': outline
         }
     
     @staticmethod
@@ -1,57 +1,164 @@
 """
 File handling utilities.
 """
+import os
 import re
 import json
+import atexit
 import logging
+import functools
+import threading
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Tuple, Optional, FrozenSet, Iterator
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+def dump_json(obj) -> bytes:
+    """Pretty-printed UTF-8 JSON (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
 class ProcessedDatabase:
-    """Simple JSON-based database to track processed files."""
+    """Simple JSON-based database to track processed files.
+    
+    Marks are appended to a JSON-lines write-ahead log next to the JSON file
+    (one line per mark, flushed every FLUSH_EVERY marks or FLUSH_INTERVAL seconds)
+    and replayed on load. compact() folds the log back into the JSON file; it
+    also runs at interpreter exit.
+    """
+    
+    FLUSH_INTERVAL = 2.0
+    FLUSH_EVERY = 50
     
     def __init__(self, db_path: Path):
         self.db_path = db_path
+        self.wal_path = db_path.with_suffix('.jsonl')
         self.data = {}
+        self._lock = threading.RLock()
+        self._wal = None  # Opened on the first mark
+        self._pending = 0  # Log lines written but not yet flushed
+        self._wake = threading.Event()
+        self._flusher = None
         self.load()
+        atexit.register(self.compact)
     
     def load(self):
-        """Load the database from file."""
+        """Load the database from file, then replay the write-ahead log."""
         if self.db_path.exists():
             try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
+                raw = self.db_path.read_bytes()
+                self.data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
             except Exception as e:
                 logger.warning(f"Failed to load processed DB: {e}")
                 self.data = {}
+        if self.wal_path.exists():
+            raw = self.wal_path.read_bytes()
+            replayed = 0
+            for line in raw.splitlines():
+                try:
+                    record = orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line)
+                except ValueError:
+                    continue  # Torn final line from an interrupted run
+                self.data[record['key']] = record['value']
+                replayed += 1
+            logger.info(f"Replayed {replayed} entries from {self.wal_path.name}")
+            # Keep appending to the log (compact() folds it in at exit), but drop a
+            # torn trailing line first so new appends never follow it
+            end = raw.rfind(b'\n') + 1
+            if end != len(raw):
+                logger.warning(f"Truncating torn record in {self.wal_path}")
+                os.truncate(self.wal_path, end)
     
     def save(self):
-        """Save the database to file."""
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        """Save the database to file and reset the write-ahead log."""
+        with self._lock:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.db_path.with_name(self.db_path.name + '.tmp')
+            tmp_path.write_bytes(dump_json(self.data))
+            tmp_path.replace(self.db_path)
+            # Replaying an old log over the new file is harmless, so truncate only after the replace
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+            self.wal_path.unlink(missing_ok=True)
+            self._pending = 0
+    
+    def flush(self):
+        """Push buffered log lines to disk, if any."""
+        with self._lock:
+            if self._pending:
+                self._wal.flush()
+                self._pending = 0
+    
+    def compact(self):
+        """Fold the write-ahead log into the JSON file."""
+        with self._lock:
+            if self._wal is not None or self.wal_path.exists():
+                self.save()
+    
+    def _record(self, key: str, entry: dict):
+        """Store an entry and append it to the write-ahead log."""
+        record = {'key': key, 'value': entry}
+        if ORJSON_AVAILABLE:
+            line = orjson.dumps(record) + b'\n'
+        else:
+            line = json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n'
+        with self._lock:
+            self.data[key] = entry
+            if self._wal is None:
+                self.wal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._wal = open(self.wal_path, 'ab', buffering=1 << 16)
+            self._wal.write(line)
+            self._pending += 1
+            if self._pending >= self.FLUSH_EVERY:
+                self._wal.flush()
+                self._pending = 0
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='processed-db-flush', daemon=True)
+                self._flusher.start()
+    
+    def _flush_loop(self):
+        """Background flusher so a quiet log is still persisted every FLUSH_INTERVAL seconds."""
+        while True:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Failed to flush processed DB: {e}")
     
     def is_processed(self, key: str) -> bool:
         """Check if a file has been processed."""
         return key in self.data
     
+    def snapshot_processed(self) -> FrozenSet[str]:
+        """Return the processed keys as a frozen set for bulk membership checks."""
+        with self._lock:
+            return frozenset(self.data)
+    
     def mark(self, key: str, status: str):
         """Mark a file as processed with given status."""
-        self.data[key] = {'status': status, 'timestamp': None}
-        self.save()
+        self._record(key, {'status': status, 'timestamp': None})
     
     def clear(self):
         """Clear all processed records."""
-        self.data.clear()
-        self.save()
+        with self._lock:
+            self.data.clear()
+            self.save()
+
+# Pattern: {meeting_name}_第{N}回_{YYYYMMDD}_{additional_info}
+_FILENAME_PATTERN = re.compile(r'^(.+?)_第(\d+)回_(\d{8})(?:_.*)?$')
 
+@functools.lru_cache(maxsize=4096)
 def parse_filename(filename: str) -> Tuple[str, str, str]:
     """Parse meeting filename to extract meeting name, round, and date."""
-    # Pattern: {meeting_name}_第{N}回_{YYYYMMDD}_{additional_info}
-    pattern = r'^(.+?)_第(\d+)回_(\d{8})(?:_.*)?$'
-    match = re.match(pattern, filename)
+    match = _FILENAME_PATTERN.match(filename)
     
     if match:
         meeting_name = match.group(1)
@@ -79,17 +186,36 @@ def cleanup_cache(cache_dir: Path, days: int):
     
     logger.info(f"Removed {removed_count} old cache files")
 
+def iter_pdf_files(root: Path) -> Iterator[os.DirEntry]:
+    """Walk root with os.scandir and yield entries for *.pdf files.
+    
+    Names are tested from the directory listing, so non-PDF files are never
+    stat'ed or turned into Path objects. Like rglob, symlinked directories are
+    not followed (no duplicates, no cycles).
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.pdf') and entry.is_file():
+                        yield entry
+        except OSError as e:
+            logger.warning(f"Cannot scan directory: {e}")
+
 def find_pdfs(data_root: Path, meeting_filter: Optional[str] = None, 
               round_filter: Optional[int] = None) -> list:
     """Find PDF files based on filters."""
     pdfs = []
     
-    for pdf_path in data_root.rglob('*.pdf'):
-        meeting, round_num, date = parse_filename(pdf_path.stem)
+    for entry in iter_pdf_files(data_root):
+        meeting, round_num, date = parse_filename(entry.name[:-4])
         
         # Skip files that don't match the expected naming pattern
         if meeting is None or round_num is None or date is None:
-            logger.info(f"Skipping invalid filename: {pdf_path.name}")
+            logger.info(f"Skipping invalid filename: {entry.name}")
             continue
             
         if meeting_filter:
@@ -100,6 +226,6 @@ def find_pdfs(data_root: Path, meeting_filter: Optional[str] = None,
             if int(round_num) != round_filter:
                 continue
         
-        pdfs.append(pdf_path)
+        pdfs.append(entry.path)
     
-    return sorted(pdfs)
\ No newline at end of file
+    return [Path(p) for p in sorted(pdfs)]
\ No newline at end of file
@@ -4,8 +4,8 @@ Advanced file parsing and metadata extraction for Japanese government documents.
 Supports both デジタル庁 and こども家庭庁 directory structures.
 """
 import re
-import json
 import logging
+import functools
 import unicodedata
 from pathlib import Path
 from typing import Tuple, Optional, Dict, Any
@@ -14,7 +14,15 @@ from datetime import datetime
 logger = logging.getLogger(__name__)
 
 # Import base class from original file_utils
-from .file_utils import ProcessedDatabase as BaseProcessedDatabase
+from .file_utils import ProcessedDatabase as BaseProcessedDatabase, iter_pdf_files
+
+# Characters not allowed in output filenames
+_UNSAFE_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*]')
+
+@functools.lru_cache(maxsize=None)
+def _format_date(date: str) -> str:
+    """YYYYMMDD -> YYYY-MM-DD (few distinct dates, so memoized)."""
+    return f"{date[:4]}-{date[4:6]}-{date[6:]}"
 
 class FileMetadata:
     """Metadata extracted from government document filenames."""
@@ -44,49 +52,70 @@ class FileMetadata:
             'pattern_used': self.pattern_used
         }
     
-    def get_formatted_date(self) -> Optional[str]:
-        """Get formatted date string (YYYY-MM-DD)."""
+    @property
+    def date(self) -> Optional[str]:
+        return self._date
+    
+    @date.setter
+    def date(self, value: Optional[str]):
+        self._date = value
+        self.__dict__.pop('formatted_date', None)  # Invalidate the memoized format
+    
+    @functools.cached_property
+    def formatted_date(self) -> Optional[str]:
+        """Formatted date string (YYYY-MM-DD), computed once per date."""
         if self.date and len(self.date) == 8:
-            return f"{self.date[:4]}-{self.date[4:6]}-{self.date[6:]}"
+            return _format_date(self.date)
         return None
+    
+    def get_formatted_date(self) -> Optional[str]:
+        """Get formatted date string (YYYY-MM-DD)."""
+        return self.formatted_date
 
 class EnhancedFileParser:
     """Enhanced file parser with multiple pattern support."""
     
-    # Define patterns in priority order
+    # Define patterns in priority order (compiled once, at class creation)
     PATTERNS = [
         # Standard pattern: {meeting}_第{N}回_{YYYYMMDD}_{optional}
         {
             'name': 'standard',
-            'pattern': r'^(.+?)_第(\d+)回_(\d{8})(?:_(.*))?$',
+            'pattern': re.compile(r'^(.+?)_第(\d+)回_(\d{8})(?:_(.*))?$'),
             'groups': ['meeting_name', 'round_num', 'date', 'additional_info']
         },
         # Fiscal year pattern: {meeting}_{fiscal_year}{period}
         {
             'name': 'fiscal_year',
-            'pattern': r'^(.+?)_(令和|平成)(\d+)年度?(全体|概要|上期|下期|第[1-4]四半期)?$',
+            'pattern': re.compile(r'^(.+?)_(令和|平成)(\d+)年度?(全体|概要|上期|下期|第[1-4]四半期)?$'),
             'groups': ['meeting_name', 'era', 'year', 'period']
         },
         # Simple report pattern: {report_name} (for direct files under meeting folders)
         {
             'name': 'simple_report',
-            'pattern': r'^([^_]+(?:について|報告書|まとめ|概要|資料))$',
+            'pattern': re.compile(r'^([^_]+(?:について|報告書|まとめ|概要|資料))$'),
             'groups': ['document_name']
         },
         # Meeting with date only: {meeting}_{YYYYMMDD}_{optional}
         {
             'name': 'date_only',
-            'pattern': r'^(.+?)_(\d{8})(?:_(.*))?$',
+            'pattern': re.compile(r'^(.+?)_(\d{8})(?:_(.*))?$'),
             'groups': ['meeting_name', 'date', 'additional_info']
         },
         # Notification pattern: {type}_{content}
         {
             'name': 'notification',
-            'pattern': r'^(通知|別添|参考資料|Q&A|活用について)(?:_(.*))?$',
+            'pattern': re.compile(r'^(通知|別添|参考資料|Q&A|活用について)(?:_(.*))?$'),
             'groups': ['document_type', 'content']
         }
     ]
     
+    # Round-specific folder: {meeting}_第{N}回_{YYYYMMDD}
+    SESSION_DIR_PATTERN = re.compile(r'^(.+?)_第\d+回_\d{8}$')
+    
+    # Ministry names as they appear in NFC-normalized paths
+    DIGITAL_MINISTRY = unicodedata.normalize('NFC', 'デジタル庁')
+    KODOMO_MINISTRY = unicodedata.normalize('NFC', 'こども家庭庁')
+    
     # Document type keywords
     DOC_TYPE_KEYWORDS = {
         '議事次第': 'agenda',
@@ -107,6 +136,16 @@ class EnhancedFileParser:
         'まとめ': 'summary_report'
     }
     
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _match_patterns(filename: str) -> Optional[Tuple[str, tuple]]:
+        """Return (pattern name, groups) for the first matching pattern; memoized per filename."""
+        for pattern_info in EnhancedFileParser.PATTERNS:
+            match = pattern_info['pattern'].match(filename)
+            if match:
+                return pattern_info['name'], match.groups()
+        return None
+    
     @classmethod
     def parse_filename(cls, filename: str, pdf_path: Path) -> FileMetadata:
         """Parse filename with enhanced pattern matching."""
@@ -114,19 +153,17 @@ class EnhancedFileParser:
         
         # Determine ministry from path with Unicode normalization
         path_str = unicodedata.normalize('NFC', str(pdf_path))
-        digital_ministry = unicodedata.normalize('NFC', 'デジタル庁')
-        kodomo_ministry = unicodedata.normalize('NFC', 'こども家庭庁')
         
-        if digital_ministry in path_str:
+        if cls.DIGITAL_MINISTRY in path_str:
             metadata.ministry = 'デジタル庁'
-        elif kodomo_ministry in path_str:
+        elif cls.KODOMO_MINISTRY in path_str:
             metadata.ministry = 'こども家庭庁'
         
         # Extract meeting name from parent directory if possible
         parent_dir = pdf_path.parent.name
         if parent_dir and '_第' in parent_dir:
             # This is likely a round-specific folder
-            meeting_match = re.match(r'^(.+?)_第\d+回_\d{8}$', parent_dir)
+            meeting_match = cls.SESSION_DIR_PATTERN.match(parent_dir)
             if meeting_match:
                 default_meeting = meeting_match.group(1)
             else:
@@ -135,62 +172,57 @@ class EnhancedFileParser:
             # Direct child of meeting folder
             default_meeting = parent_dir
         
-        # Try each pattern
-        for pattern_info in cls.PATTERNS:
-            pattern = pattern_info['pattern']
-            match = re.match(pattern, filename)
+        # Try each pattern (first match wins)
+        matched = cls._match_patterns(filename)
+        if matched:
+            name, groups = matched
+            metadata.pattern_used = name
             
-            if match:
-                metadata.pattern_used = pattern_info['name']
-                groups = match.groups()
+            # Process based on pattern type
+            if name == 'standard':
+                metadata.meeting_name = groups[0]
+                metadata.round_num = groups[1].zfill(2)
+                metadata.date = groups[2]
+                metadata.additional_info = groups[3]
+                metadata.is_valid = True
                 
-                # Process based on pattern type
-                if pattern_info['name'] == 'standard':
-                    metadata.meeting_name = groups[0]
-                    metadata.round_num = groups[1].zfill(2)
-                    metadata.date = groups[2]
-                    metadata.additional_info = groups[3]
-                    metadata.is_valid = True
-                    
-                elif pattern_info['name'] == 'fiscal_year':
-                    metadata.meeting_name = groups[0] or default_meeting
-                    era = groups[1]
-                    year = int(groups[2])
-                    # Convert Japanese era to Western year
-                    if era == '令和':
-                        western_year = 2018 + year
-                    else:  # 平成
-                        western_year = 1988 + year
-                    metadata.fiscal_year = f"{western_year}"
-                    metadata.additional_info = groups[3]
-                    metadata.is_valid = True
-                    
-                elif pattern_info['name'] == 'simple_report':
-                    metadata.meeting_name = default_meeting
-                    metadata.document_type = 'report'
-                    metadata.additional_info = groups[0]
-                    metadata.is_valid = True
-                    
-                elif pattern_info['name'] == 'date_only':
-                    metadata.meeting_name = groups[0]
-                    metadata.date = groups[1]
-                    metadata.additional_info = groups[2]
-                    metadata.is_valid = True
-                    
-                elif pattern_info['name'] == 'notification':
-                    metadata.meeting_name = default_meeting
-                    metadata.document_type = groups[0]
-                    metadata.additional_info = groups[1]
-                    metadata.is_valid = True
+            elif name == 'fiscal_year':
+                metadata.meeting_name = groups[0] or default_meeting
+                era = groups[1]
+                year = int(groups[2])
+                # Convert Japanese era to Western year
+                if era == '令和':
+                    western_year = 2018 + year
+                else:  # 平成
+                    western_year = 1988 + year
+                metadata.fiscal_year = f"{western_year}"
+                metadata.additional_info = groups[3]
+                metadata.is_valid = True
                 
-                # Extract document type from additional info
-                if metadata.additional_info:
-                    for keyword, doc_type in cls.DOC_TYPE_KEYWORDS.items():
-                        if keyword in metadata.additional_info:
-                            metadata.document_type = doc_type
-                            break
+            elif name == 'simple_report':
+                metadata.meeting_name = default_meeting
+                metadata.document_type = 'report'
+                metadata.additional_info = groups[0]
+                metadata.is_valid = True
                 
-                break
+            elif name == 'date_only':
+                metadata.meeting_name = groups[0]
+                metadata.date = groups[1]
+                metadata.additional_info = groups[2]
+                metadata.is_valid = True
+                
+            elif name == 'notification':
+                metadata.meeting_name = default_meeting
+                metadata.document_type = groups[0]
+                metadata.additional_info = groups[1]
+                metadata.is_valid = True
+            
+            # Extract document type from additional info
+            if metadata.additional_info:
+                for keyword, doc_type in cls.DOC_TYPE_KEYWORDS.items():
+                    if keyword in metadata.additional_info:
+                        metadata.document_type = doc_type
+                        break
         
         # If no pattern matched, use fallback
         if not metadata.is_valid:
@@ -207,12 +239,11 @@ class EnhancedProcessedDatabase(BaseProcessedDatabase):
     
     def mark_with_metadata(self, key: str, status: str, metadata: FileMetadata):
         """Mark a file as processed with metadata."""
-        self.data[key] = {
+        self._record(key, {
             'status': status,
             'timestamp': datetime.now().isoformat(),
             'metadata': metadata.to_dict()
-        }
-        self.save()
+        })
     
     def get_metadata(self, key: str) -> Optional[Dict[str, Any]]:
         """Get metadata for a processed file."""
@@ -240,12 +271,13 @@ def find_pdfs_enhanced(data_root: Path, meeting_filter: Optional[str] = None,
     pdfs = []
     parser = EnhancedFileParser()
     
-    for pdf_path in data_root.rglob('*.pdf'):
-        # Skip hidden files and temp files
-        if pdf_path.name.startswith('.') or pdf_path.name.startswith('~'):
+    for entry in iter_pdf_files(data_root):
+        # Skip hidden files and temp files (before building a Path)
+        if entry.name.startswith(('.', '~')):
             continue
-            
-        metadata = parser.parse_filename(pdf_path.name, pdf_path)
+        
+        pdf_path = Path(entry.path)
+        metadata = parser.parse_filename(entry.name, pdf_path)
         
         # Apply filters
         if ministry_filter:
@@ -280,7 +312,7 @@ def generate_output_filename(metadata: FileMetadata) -> str:
     
     # Add date or fiscal year
     if metadata.date:
-        formatted_date = metadata.get_formatted_date()
+        formatted_date = metadata.formatted_date
         if formatted_date:
             parts.append(formatted_date)
     elif metadata.fiscal_year:
@@ -300,7 +332,7 @@ def generate_output_filename(metadata: FileMetadata) -> str:
     filename = '_'.join(parts) + '.md'
     
     # Sanitize filename
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _UNSAFE_FILENAME_CHARS.sub('_', filename)
     
     return filename
 